@@ -8,49 +8,266 @@ from flask_cors import CORS
 import joblib
 import json
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+import csv
+import io
+import math
+import time
+from itertools import count, islice
+from sklearn.preprocessing import normalize
 import os
+import signal
+import threading
+from qa_index import InvertedIndex, load_saved_question_matrix, question_matrix_fingerprint
+from qa_batcher import QueryBatcher
+from qa_pool import RetrievalPool
+from keyword_matcher import KeywordMatcher
+from response_cache import ResponseCache
+from forest_engine import FlatForest
+from model_store import ModelStore
+from model_bundle import ModelBundle, bundle_exists
+from query_cache import QueryCache, normalize_query
+from singleflight import SingleFlight
+from metrics import Instrumentation, add_request_timings, capture_stages, message_language
+from profiling import RequestProfiler, SamplingProfiler, token_authorized
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend access
 
-# Load models on startup
-print("🔄 Loading AI models...")
-
-try:
-    qa_vectorizer = joblib.load('../models/qa_vectorizer.pkl')
-    qa_database = joblib.load('../models/qa_database.pkl')
-    print("✓ Q&A Model loaded")
-except:
-    print("⚠ Q&A Model not found")
-    qa_vectorizer = None
-    qa_database = None
-
-try:
-    calorie_predictor = joblib.load('../models/calorie_predictor.pkl')
-    print("✓ Calorie Predictor loaded")
-except:
-    print("⚠ Calorie Predictor not found")
-    calorie_predictor = None
-
-try:
-    exercise_recommender = joblib.load('../models/exercise_recommender.pkl')
-    exercise_encoder = joblib.load('../models/exercise_encoder.pkl')
-    print("✓ Exercise Recommender loaded")
-except:
-    print("⚠ Exercise Recommender not found")
-    exercise_recommender = None
-    exercise_encoder = None
-
-try:
-    with open('../models/health_knowledge.json', 'r') as f:
-        health_knowledge = json.load(f)
-    print("✓ Health Knowledge Base loaded")
-except:
-    print("⚠ Health Knowledge Base not found")
-    health_knowledge = {}
+METRICS = Instrumentation('app')
+METRICS.install(app)
+PROFILER = RequestProfiler('app')
+PROFILER.install(app)
+SAMPLER = SamplingProfiler('app')
+SAMPLER.install(app)
 
-print("✅ Models loaded successfully!\n")
+# Q&A retrieval settings
+QA_TOP_K = 1
+QA_MIN_CONFIDENCE = 0.15  # Lowered from 0.1 for better matching
+
+# Micro-batching of concurrent Q&A lookups
+QA_BATCHING = True
+QA_BATCH_MAX_SIZE = 32
+QA_BATCH_WINDOW_MS = 2.0
+QA_BATCH_TIMEOUT = 1.0  # seconds before a request gives up on the batcher
+
+# Worker processes for Q&A retrieval (0 = answer in this process).
+# Workers share one copy of the question index through shared memory
+QA_PROCESSES = 0
+
+# Cache of retrieval results keyed by the normalized question
+QA_CACHE_MAX_ENTRIES = 2048
+QA_CACHE_TTL = 600  # seconds
+
+# Largest number of messages accepted by /chat/batch
+CHAT_BATCH_MAX_ITEMS = 10000
+
+# Largest roster accepted by /health-check/batch
+HEALTH_CHECK_BATCH_MAX_ROWS = 1000000
+# Accepted (low, high] range per numeric roster column; anything outside is a bad row
+COHORT_LIMITS = {'age': (-1, 150), 'weight': (0, 1000), 'height': (0, 300)}
+
+# Rows predicted per call while reading a /predict-calories/batch food log
+CALORIE_BATCH_CHUNK_ROWS = 50000
+
+# Above this many rows sklearn's compiled traversal beats the NumPy one
+FLAT_FOREST_MAX_ROWS = 512
+
+# Versioned, memory-mappable model bundle; preferred over the pickles when present
+MODEL_BUNDLE_DIR = '../models/bundle'
+
+# Admin endpoints (/admin/...) are disabled unless this is set
+ADMIN_TOKEN = os.environ.get('HEALTHNEST_ADMIN_TOKEN')
+
+# Queries run against a freshly loaded model set before it goes live
+WARMUP_QUESTIONS = ['How much water should I drink?', 'What exercises should I do?', 'How can I sleep better?']
+WARMUP_MACROS = [[10, 20, 5], [25, 40, 15]]
+
+
+def load_question_matrix(vectorizer, database, path='../models/qa_question_matrix.npz'):
+    """Load (or build) the L2-normalized TF-IDF matrix of all stored questions"""
+    if vectorizer is None or database is None:
+        return None
+    
+    # The shape alone can't tell a stale matrix apart (the vocabulary size is
+    # capped), so it must carry the fingerprint of this vectorizer and database
+    expected_shape = (len(database['questions']), len(vectorizer.vocabulary_))
+    if os.path.exists(path):
+        matrix = load_saved_question_matrix(path, question_matrix_fingerprint(vectorizer, database['questions']))
+        if matrix is not None and matrix.shape == expected_shape:
+            return matrix
+        print("⚠ Stale question matrix, rebuilding")
+    
+    # TfidfVectorizer already L2-normalizes rows, but be explicit so a
+    # plain dot product is a cosine similarity regardless of settings
+    return normalize(vectorizer.transform(database['questions'])).tocsr()
+
+
+def load_calorie_forest(model, path='../models/calorie_forest.npz'):
+    """Flat-array copy of the calorie forest, checked against sklearn before use"""
+    if model is None:
+        return None
+    
+    try:
+        forest = FlatForest.load(path) if os.path.exists(path) else FlatForest.from_sklearn(model)
+        probe = np.random.default_rng(0).uniform(0, 100, (256, model.n_features_in_))
+        if not np.array_equal(forest.predict(probe), model.predict(probe)):
+            # Stale export from an older training run
+            forest = FlatForest.from_sklearn(model)
+            if not np.array_equal(forest.predict(probe), model.predict(probe)):
+                print("⚠ Flat calorie forest disagrees with sklearn, not using it")
+                return None
+        return forest
+    except Exception as e:
+        print(f"⚠ Flat calorie forest unavailable: {e}")
+        return None
+
+
+MODEL_SET_IDS = count(1)
+
+
+class ModelSet:
+    """Every model the API serves from, loaded and replaced as one unit"""
+    
+    def __init__(self, source='pickles'):
+        self.set_id = next(MODEL_SET_IDS)  # part of cache keys, so a reload starts fresh
+        self.source = source
+        self.qa_vectorizer = None
+        self.qa_database = None
+        self.qa_question_matrix = None
+        self.qa_index = None
+        self.qa_pool = None
+        self.calorie_predictor = None
+        self.calorie_forest = None
+        self.exercise_recommender = None
+        self.exercise_encoder = None
+        self.health_knowledge = {}
+    
+    @property
+    def has_calorie_model(self):
+        return self.calorie_forest is not None or self.calorie_predictor is not None
+
+
+def load_models_from_pickles():
+    """Legacy layout: joblib/pickle files written by the training notebooks"""
+    models = ModelSet('pickles')
+    
+    try:
+        models.qa_vectorizer = joblib.load('../models/qa_vectorizer.pkl')
+        models.qa_database = joblib.load('../models/qa_database.pkl')
+        print("✓ Q&A Model loaded")
+    except:
+        print("⚠ Q&A Model not found")
+    
+    models.qa_question_matrix = load_question_matrix(models.qa_vectorizer, models.qa_database)
+    
+    try:
+        models.calorie_predictor = joblib.load('../models/calorie_predictor.pkl')
+        print("✓ Calorie Predictor loaded")
+    except:
+        print("⚠ Calorie Predictor not found")
+    
+    models.calorie_forest = load_calorie_forest(models.calorie_predictor)
+    if models.calorie_forest is not None:
+        print(f"✓ Calorie forest flattened ({len(models.calorie_forest.roots)} trees, {len(models.calorie_forest.value)} nodes)")
+    
+    try:
+        models.exercise_recommender = joblib.load('../models/exercise_recommender.pkl')
+        models.exercise_encoder = joblib.load('../models/exercise_encoder.pkl')
+        print("✓ Exercise Recommender loaded")
+    except:
+        print("⚠ Exercise Recommender not found")
+    
+    try:
+        with open('../models/health_knowledge.json', 'r') as f:
+            models.health_knowledge = json.load(f)
+        print("✓ Health Knowledge Base loaded")
+    except:
+        print("⚠ Health Knowledge Base not found")
+    
+    return models
+
+
+def load_models_from_bundle(directory):
+    """Bundle layout: arrays memory-mapped straight from the page cache"""
+    bundle = ModelBundle(directory)
+    models = ModelSet(f"bundle {bundle.manifest['created_at']}")
+    
+    models.qa_vectorizer, models.qa_database, models.qa_question_matrix = bundle.qa_models()
+    if models.qa_vectorizer is not None:
+        print("✓ Q&A Model mapped")
+    
+    # The flat forest serves every batch size; the sklearn pickle isn't needed
+    models.calorie_forest = bundle.calorie_forest()
+    if models.calorie_forest is not None:
+        print(f"✓ Calorie forest mapped ({len(models.calorie_forest.roots)} trees, {len(models.calorie_forest.value)} nodes)")
+    
+    models.exercise_recommender, models.exercise_encoder = bundle.exercise_models()
+    if models.exercise_recommender is not None:
+        print("✓ Exercise Recommender loaded")
+    
+    models.health_knowledge = bundle.health_knowledge()
+    if models.health_knowledge:
+        print("✓ Health Knowledge Base loaded")
+    
+    return models
+
+
+def load_models():
+    """Load every model from ../models into a new ModelSet"""
+    print("🔄 Loading AI models...")
+    models = None
+    if bundle_exists(MODEL_BUNDLE_DIR):
+        try:
+            models = load_models_from_bundle(MODEL_BUNDLE_DIR)
+        except Exception as e:
+            print(f"⚠ Model bundle unreadable, falling back to pickles: {e}")
+    if models is None:
+        models = load_models_from_pickles()
+    
+    if models.qa_question_matrix is not None:
+        models.qa_index = InvertedIndex(models.qa_question_matrix)
+        print(f"✓ Question index ready ({models.qa_question_matrix.shape[0]} questions)")
+        
+        if QA_PROCESSES:
+            models.qa_pool = RetrievalPool(models.qa_vectorizer, models.qa_question_matrix, processes=QA_PROCESSES)
+            models.qa_pool.start()
+            print(f"✓ Q&A process pool ready ({QA_PROCESSES} workers, shared index)")
+    
+    return models
+
+
+def warm_up_models(models):
+    """Run a few real queries so the first requests after a swap aren't cold"""
+    if models.qa_index is not None:
+        question_vecs = normalize(models.qa_vectorizer.transform(WARMUP_QUESTIONS))
+        models.qa_index.search_batch(question_vecs, k=QA_TOP_K, threshold=QA_MIN_CONFIDENCE)
+        if models.qa_pool is not None:
+            models.qa_pool.search(WARMUP_QUESTIONS, QA_TOP_K, QA_MIN_CONFIDENCE)
+    if models.has_calorie_model:
+        predict_calorie_rows(np.array(WARMUP_MACROS, dtype=float), models)
+
+
+def check_models(old, new):
+    """Refuse a set that lost a model the live set has (e.g. a half-written retrain)"""
+    for name in ('qa_index', 'exercise_recommender'):
+        if getattr(old, name) is not None and getattr(new, name) is None:
+            return f"new model set is missing {name}"
+    if old.has_calorie_model and not new.has_calorie_model:
+        return "new model set is missing the calorie model"
+    if old.health_knowledge and not new.health_knowledge:
+        return "new model set is missing the health knowledge base"
+    return None
+
+
+def retire_models(models):
+    """Release what a replaced (or rejected) set holds outside the Python heap"""
+    if models.qa_pool is not None:
+        models.qa_pool.close()
+    QA_CACHE.clear()
+    RESPONSE_CACHE.clear()
+
+
+model_store = ModelStore(load_models, warmup=warm_up_models, check=check_models, retire=retire_models)
 
 
 # Helper Functions
@@ -60,8 +277,9 @@ def get_bmi(weight_kg, height_m):
     return weight_kg / (height_m ** 2)
 
 
-def get_bmi_category(bmi):
+def get_bmi_category(bmi, models):
     """Get BMI category and advice"""
+    health_knowledge = models.health_knowledge
     if 'bmi_ranges' not in health_knowledge:
         return None
     
@@ -74,8 +292,9 @@ def get_bmi_category(bmi):
     return None
 
 
-def handle_pregnancy_query(message, user_profile):
+def handle_pregnancy_query(message, user_profile, models):
     """Handle pregnancy-related queries"""
+    health_knowledge = models.health_knowledge
     if 'pregnancy' not in health_knowledge:
         return None
     
@@ -97,7 +316,8 @@ def handle_pregnancy_query(message, user_profile):
             return {
                 'answer': answer,
                 'confidence': 0.95,
-                'category': 'pregnancy'
+                'category': 'pregnancy',
+                'cache_key': ('pregnancy', models.set_id, week)
             }
     
     # General pregnancy advice
@@ -114,12 +334,14 @@ def handle_pregnancy_query(message, user_profile):
     return {
         'answer': answer,
         'confidence': 0.85,
-        'category': 'pregnancy'
+        'category': 'pregnancy',
+        'cache_key': ('pregnancy',)
     }
 
 
-def handle_womens_health_query(message, user_profile):
+def handle_womens_health_query(message, user_profile, models):
     """Handle women's health queries"""
+    health_knowledge = models.health_knowledge
     if 'womens_health' not in health_knowledge:
         return None
     
@@ -133,7 +355,8 @@ def handle_womens_health_query(message, user_profile):
             return {
                 'answer': answer,
                 'confidence': 0.9,
-                'category': 'womens_health'
+                'category': 'womens_health',
+                'cache_key': ('womens_health', models.set_id, symptom)
             }
     
     # General women's health advice
@@ -150,12 +373,21 @@ def handle_womens_health_query(message, user_profile):
     return {
         'answer': answer,
         'confidence': 0.8,
-        'category': 'womens_health'
+        'category': 'womens_health',
+        'cache_key': ('womens_health',)
     }
 
 
-def get_daily_water(weight_kg):
+def predict_calorie_rows(X, models):
+    """Predicted calories for rows of [protein, carbs, fat]"""
+    if models.calorie_forest is not None and (len(X) <= FLAT_FOREST_MAX_ROWS or models.calorie_predictor is None):
+        return models.calorie_forest.predict(X)
+    return models.calorie_predictor.predict(X)
+
+
+def get_daily_water(weight_kg, models):
     """Calculate daily water intake"""
+    health_knowledge = models.health_knowledge
     if 'daily_water' not in health_knowledge:
         return 2.5
     
@@ -165,6 +397,16 @@ def get_daily_water(weight_kg):
     return round(water, 1)
 
 
+# Activity multiplier
+ACTIVITY_MULTIPLIERS = {
+    'sedentary': 1.2,
+    'light': 1.375,
+    'moderate': 1.55,
+    'active': 1.725,
+    'very_active': 1.9
+}
+
+
 def get_calorie_needs(age, gender, weight_kg, height_cm, activity_level):
     """Calculate daily calorie needs (Harris-Benedict Equation)"""
     # BMR calculation
@@ -173,57 +415,226 @@ def get_calorie_needs(age, gender, weight_kg, height_cm, activity_level):
     else:
         bmr = 447.593 + (9.247 * weight_kg) + (3.098 * height_cm) - (4.330 * age)
     
-    # Activity multiplier
-    activity_multipliers = {
-        'sedentary': 1.2,
-        'light': 1.375,
-        'moderate': 1.55,
-        'active': 1.725,
-        'very_active': 1.9
-    }
-    
-    multiplier = activity_multipliers.get(activity_level.lower(), 1.55)
+    multiplier = ACTIVITY_MULTIPLIERS.get(activity_level.lower(), 1.55)
     tdee = bmr * multiplier
     
     return round(tdee)
 
 
-def answer_question(question, user_profile=None):
+def round_half_even(values, ndigits):
+    """np.round that agrees with Python's round() on near-ties"""
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, ndigits)
+    
+    # np.round scales by 10**ndigits first, which can land exactly on .5 when the
+    # true value is just above or below it; hand those few to Python's round()
+    scaled = values * 10 ** ndigits
+    near_tie = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in near_tie:
+        rounded[i] = round(float(values[i]), ndigits)
+    return rounded
+
+
+def get_bmi_bins(health_knowledge):
+    """Bin edges and labels so np.digitize reproduces get_bmi_category()"""
+    ranges = health_knowledge.get('bmi_ranges', {})
+    edges = sorted({bound for data in ranges.values() for bound in data['range']})
+    
+    # labels[i] covers [edges[i-1], edges[i]); gaps between ranges stay 'unknown'
+    labels = ['unknown']
+    for low, high in zip(edges, edges[1:]):
+        label = 'unknown'
+        for category, data in ranges.items():
+            if data['range'][0] <= low and high <= data['range'][1]:
+                label = category
+                break
+        labels.append(label)
+    labels.append('unknown')
+    
+    return np.array(edges, dtype=float), np.array(labels)
+
+
+def get_cohort_metrics(age, gender, weight, height, activity, models):
+    """Vectorized /health-check metrics for whole arrays of profiles"""
+    health_knowledge = models.health_knowledge
+    age = np.asarray(age, dtype=float)
+    weight = np.asarray(weight, dtype=float)
+    height = np.asarray(height, dtype=float)
+    gender = np.char.lower(np.asarray(gender, dtype=str))
+    activity = np.asarray(activity, dtype=str)
+    
+    bmi = weight / (height / 100) ** 2
+    edges, labels = get_bmi_bins(health_knowledge)
+    bmi_category = labels[np.digitize(bmi, edges)]
+    
+    if 'daily_water' in health_knowledge:
+        water = np.clip(weight * 0.033, health_knowledge['daily_water']['min'],
+                        health_knowledge['daily_water']['max'])
+        water = round_half_even(water, 1)
+    else:
+        water = np.full(len(weight), 2.5)
+    
+    # Harris-Benedict, same coefficients as get_calorie_needs()
+    bmr = np.where(
+        gender == 'male',
+        88.362 + (13.397 * weight) + (4.799 * height) - (5.677 * age),
+        447.593 + (9.247 * weight) + (3.098 * height) - (4.330 * age)
+    )
+    activity_lower = np.char.lower(activity)
+    multiplier = np.full(len(bmr), 1.55)
+    for level, value in ACTIVITY_MULTIPLIERS.items():
+        multiplier[activity_lower == level] = value
+    calories = np.rint(bmr * multiplier).astype(int)
+    
+    step_goal = np.where(np.isin(activity, ['active', 'very_active']), 10000, 7500)
+    
+    return {
+        'bmi': round_half_even(bmi, 1),
+        'bmi_category': bmi_category,
+        'daily_water_liters': water,
+        'daily_calories': calories,
+        'step_goal': step_goal
+    }
+
+
+def answer_question(question, user_profile=None, top_k=QA_TOP_K, min_confidence=QA_MIN_CONFIDENCE, models=None):
     """Answer health questions using Q&A model with improved flexibility"""
-    if qa_vectorizer is None or qa_database is None:
+    models = models or model_store.current
+    if models.qa_vectorizer is None or models.qa_database is None:
         return {
             'answer': "Sorry, the Q&A model is not available at the moment.",
             'confidence': 0.0,
             'category': 'error'
         }
     
-    # Vectorize question
-    question_vec = qa_vectorizer.transform([question])
+    # Retrieval doesn't depend on the profile; personalization is added after the cache
+    key = (models.set_id, normalize_query(question), top_k, min_confidence)
+    matches = QA_CACHE.get(key)
+    if matches is None:
+        # A burst of the same question runs retrieval once; the rest wait for it
+        with METRICS.stage('retrieval'):
+            matches = QA_FLIGHTS.do(key, lambda: cache_matches(key, retrieve_matches(models, key[1], top_k, min_confidence)))
+    
+    return build_answer(matches, user_profile, models)
+
+
+def cache_matches(key, matches):
+    QA_CACHE.put(key, matches)
+    return matches
+
+
+def retrieve_matches(models, question, top_k=QA_TOP_K, min_confidence=QA_MIN_CONFIDENCE):
+    """Ranked (question id, score) matches via the process pool, the batcher or directly"""
+    matches = None
+    # A set retired by a reload closes its pool; requests still holding it answer directly
+    if models.qa_pool is not None and not models.qa_pool.closed:
+        try:
+            with METRICS.stage('pool_search'):
+                matches = models.qa_pool.search([question], top_k, min_confidence)[0]
+        except Exception as e:
+            print(f"⚠ Q&A process pool failed, answering directly: {e}")
+    elif qa_batcher is not None:
+        try:
+            matches, batch_timings = qa_batcher.call((models, question, top_k, min_confidence), timeout=QA_BATCH_TIMEOUT)
+            # The batch was vectorized and scored on the batcher thread
+            add_request_timings(batch_timings)
+        except Exception as e:
+            print(f"⚠ Q&A batcher failed, answering directly: {e}")
+    
+    if matches is None:
+        # Vectorize question
+        with METRICS.stage('vectorize'):
+            question_vec = normalize(models.qa_vectorizer.transform([question]))
+        
+        # Score only the questions sharing a term with the query
+        with METRICS.stage('similarity'):
+            matches = models.qa_index.search(question_vec, k=top_k, threshold=min_confidence)
     
-    # Get all question vectors
-    all_questions = qa_database['questions']
-    all_question_vecs = qa_vectorizer.transform(all_questions)
+    return matches
+
+
+def search_questions(questions, top_k=QA_TOP_K, min_confidence=QA_MIN_CONFIDENCE, models=None):
+    """Rank stored questions for many queries with one transform and one sparse matmul"""
+    models = models or model_store.current
+    if models.qa_pool is not None:
+        return models.qa_pool.search(questions, top_k, min_confidence)
     
-    # Calculate similarities
-    similarities = cosine_similarity(question_vec, all_question_vecs)[0]
+    with METRICS.stage('vectorize'):
+        question_vecs = normalize(models.qa_vectorizer.transform(questions))
+    with METRICS.stage('similarity'):
+        return models.qa_index.search_batch(question_vecs, k=top_k, threshold=min_confidence)
+
+
+def run_qa_batch(payloads):
+    """Batcher callback: payloads are (models, question, top_k, min_confidence) tuples
     
-    # Get best match
-    best_match_idx = similarities.argmax()
-    confidence = similarities[best_match_idx]
+    Each result is (matches, stage timings of the group it was scored in).
+    """
+    # Requests that started before a reload keep scoring against their own model set
+    groups = {}
+    for i, (models, question, top_k, min_confidence) in enumerate(payloads):
+        groups.setdefault(id(models), (models, []))[1].append((i, question, top_k, min_confidence))
     
-    # Lower threshold for more flexible matching
-    if confidence > 0.15:  # Lowered from 0.1 for better matching
+    results = [None] * len(payloads)
+    for models, group in groups.values():
+        questions = [question for _, question, _, _ in group]
+        top_ks = [top_k for _, _, top_k, _ in group]
+        thresholds = [min_confidence for _, _, _, min_confidence in group]
+        with capture_stages() as timings:
+            group_matches = search_questions(questions, top_ks, thresholds, models)
+        for (i, _, _, _), matches in zip(group, group_matches):
+            results[i] = (matches, timings)
+    return results
+
+
+QA_CACHE = QueryCache(max_entries=QA_CACHE_MAX_ENTRIES, ttl=QA_CACHE_TTL)
+QA_FLIGHTS = SingleFlight()
+
+qa_batcher = None
+if QA_BATCHING and not QA_PROCESSES:
+    qa_batcher = QueryBatcher(run_qa_batch, max_batch_size=QA_BATCH_MAX_SIZE, window_ms=QA_BATCH_WINDOW_MS)
+
+model_store.load()
+print("✅ Models loaded successfully!\n")
+
+METRICS.track_model_store(model_store)
+METRICS.track_cache('qa_results', QA_CACHE.stats)
+
+
+def reload_on_signal(signum, frame):
+    """SIGHUP: pick up retrained models without a restart"""
+    model_store.reload('SIGHUP')
+
+
+if hasattr(signal, 'SIGHUP') and threading.current_thread() is threading.main_thread():
+    signal.signal(signal.SIGHUP, reload_on_signal)
+
+
+def build_answer(matches, user_profile, models):
+    """Turn ranked (question id, score) matches into an answer"""
+    qa_database = models.qa_database
+    if matches:
+        best_match_idx, confidence = matches[0]
         answer = qa_database['answers'][best_match_idx]
         category = qa_database['categories'][best_match_idx]
         
         # Personalize answer if user profile provided
         if user_profile:
-            answer = personalize_answer(answer, user_profile)
+            with METRICS.stage('personalize'):
+                answer = personalize_answer(answer, user_profile, models)
         
         return {
             'answer': answer,
             'confidence': float(confidence),
-            'category': category
+            'category': category,
+            'matches': [
+                {
+                    'question': qa_database['questions'][idx],
+                    'category': qa_database['categories'][idx],
+                    'confidence': score
+                }
+                for idx, score in matches
+            ]
         }
     else:
         # Provide helpful fallback with examples
@@ -236,18 +647,19 @@ def answer_question(question, user_profile=None):
                      "• **Women's Health:** 'Period cramps relief', 'PCOS symptoms'\n\n" +
                      "💡 Try rephrasing your question or ask about a specific health topic!",
             'confidence': 0.0,
-            'category': 'unknown'
+            'category': 'unknown',
+            'matches': []
         }
 
 
-def personalize_answer(answer, profile):
+def personalize_answer(answer, profile, models):
     """Add personalized recommendations based on user profile"""
     personalized = answer
     
     # Add BMI-specific advice
     if 'weight' in profile and 'height' in profile:
         bmi = get_bmi(profile['weight'], profile['height'] / 100)
-        bmi_info = get_bmi_category(bmi)
+        bmi_info = get_bmi_category(bmi, models)
         if bmi_info:
             personalized += f"\n\n💡 Your BMI ({bmi:.1f}) is {bmi_info['category']}. {bmi_info['advice']}"
     
@@ -265,59 +677,60 @@ def personalize_answer(answer, profile):
     return personalized
 
 
-# API Routes
+# Profile fields the chat helpers compute with
+PROFILE_NUMBER_FIELDS = ('age', 'weight', 'height')
+PROFILE_TEXT_FIELDS = ('gender', 'activity', 'activity_level')
 
-@app.route('/')
-def home():
-    """API home endpoint"""
-    return jsonify({
-        'message': 'HealthNest AI Backend API',
-        'version': '1.0.0',
-        'status': 'running',
-        'endpoints': {
-            '/chat': 'POST - Chat with health assistant',
-            '/health-check': 'POST - Get personalized health analysis',
-            '/predict-calories': 'POST - Predict food calories',
-            '/recommend-exercise': 'POST - Get exercise recommendations',
-            '/pregnancy-info': 'GET - Get pregnancy week info',
-            '/health': 'GET - API health status'
-        }
-    })
+# Chat routing keywords
 
+GREETINGS = ['hi', 'hello', 'hey', 'hola', 'namaste', 'assalamu alaikum', 
+             'good morning', 'good afternoon', 'good evening', 'salam', 'kon khabar']
 
-@app.route('/health', methods=['GET'])
-def health_check():
-    """Check API health"""
-    return jsonify({
-        'status': 'healthy',
-        'models_loaded': {
-            'qa_model': qa_vectorizer is not None,
-            'calorie_predictor': calorie_predictor is not None,
-            'exercise_recommender': exercise_recommender is not None,
-            'knowledge_base': bool(health_knowledge)
-        }
-    })
+PREGNANCY_KEYWORDS = ['pregnancy', 'pregnant', 'week', 'trimester', 'baby', 'fetal', 'prenatal', 
+                      'gorbhoboti', 'conception', 'maternity', 'expecting']
+WOMENS_HEALTH_KEYWORDS = ['period', 'menstrual', 'cramp', 'pcos', 'ovulation', 'fertility', 
+                           'menopause', 'endometriosis', 'masik', 'menses', 'menstruation',
+                           'pms', 'dysmenorrhea', 'amenorrhea', 'gynecology']
+NUTRITION_KEYWORDS = ['calorie', 'calories', 'food', 'nutrition', 'diet', 'eat', 'meal', 
+                      'protein', 'carb', 'fat', 'vitamin', 'khabar', 'khaddo', 'nutrient',
+                      'mineral', 'supplement', 'balanced diet', 'healthy eating']
+EXERCISE_KEYWORDS = ['exercise', 'workout', 'fitness', 'gym', 'running', 'weight loss', 
+                     'cardio', 'strength', 'yoga', 'kashrot', 'byayam', 'training',
+                     'jogging', 'walking', 'swimming', 'cycling', 'sport', 'activity',
+                     'physical', 'movement', 'hiit', 'aerobic', 'anaerobic']
+STEPS_KEYWORDS = ['step', 'steps', 'walk', 'walking', 'daily walk', 'pedestrian',
+                  'stroll', 'pace', 'gait', 'stride', 'foot']
+BMI_NOTE_KEYWORDS = ['bmi', 'weight', 'healthy', 'swasthyo']
 
+# Compiled once; routing cost no longer grows with the number of keywords
+CHAT_KEYWORDS = KeywordMatcher({
+    'greeting': GREETINGS,
+    'pregnancy': PREGNANCY_KEYWORDS,
+    'womens_health': WOMENS_HEALTH_KEYWORDS,
+    'nutrition': NUTRITION_KEYWORDS,
+    'exercise': EXERCISE_KEYWORDS,
+    'steps': STEPS_KEYWORDS,
+    'bmi': BMI_NOTE_KEYWORDS
+}, exact_groups={'greeting'})
 
-@app.route('/chat', methods=['POST'])
-def chat():
-    """Main chatbot endpoint with improved understanding"""
-    data = request.json
-    
-    if not data or 'message' not in data:
-        return jsonify({'error': 'No message provided'}), 400
+# Serialized JSON for the replies that don't depend on the user's profile
+RESPONSE_CACHE = ResponseCache()
+METRICS.track_cache('static_responses', RESPONSE_CACHE.stats)
+
+
+def route_message(message, user_profile=None, models=None):
+    """Keyword routing for chat messages; returns None when the Q&A model should answer.
     
-    message = data['message'].strip()
+    Replies that don't depend on the user's profile carry a 'cache_key' so
+    /chat can serve them pre-serialized.
+    """
+    models = models or model_store.current
     message_lower = message.lower()
-    user_profile = data.get('profile', None)
+    domains = CHAT_KEYWORDS.match(message_lower)
     
     # Handle greetings and casual conversation
-    greetings = ['hi', 'hello', 'hey', 'hola', 'namaste', 'assalamu alaikum', 
-                 'good morning', 'good afternoon', 'good evening', 'salam', 'kon khabar']
-    
-    if any(greeting in message_lower for greeting in greetings) or len(message.split()) <= 2:
-        return jsonify({
-            'message': message,
+    if 'greeting' in domains or len(message.split()) <= 2:
+        return {
             'response': "Hello! 👋 I'm HealthNest AI, your personal health assistant. I can help you with:\n\n" +
                        "🥗 Nutrition & diet advice\n" +
                        "💪 Fitness & exercise recommendations\n" +
@@ -327,49 +740,34 @@ def chat():
                        "🏥 General health advice\n\n" +
                        "Just ask me anything about your health!",
             'confidence': 1.0,
-            'category': 'greeting'
-        })
-    
-    # Check for specific health domains with extensive keywords
-    pregnancy_keywords = ['pregnancy', 'pregnant', 'week', 'trimester', 'baby', 'fetal', 'prenatal', 
-                          'gorbhoboti', 'conception', 'maternity', 'expecting']
-    womens_health_keywords = ['period', 'menstrual', 'cramp', 'pcos', 'ovulation', 'fertility', 
-                               'menopause', 'endometriosis', 'masik', 'menses', 'menstruation',
-                               'pms', 'dysmenorrhea', 'amenorrhea', 'gynecology']
-    nutrition_keywords = ['calorie', 'calories', 'food', 'nutrition', 'diet', 'eat', 'meal', 
-                          'protein', 'carb', 'fat', 'vitamin', 'khabar', 'khaddo', 'nutrient',
-                          'mineral', 'supplement', 'balanced diet', 'healthy eating']
-    exercise_keywords = ['exercise', 'workout', 'fitness', 'gym', 'running', 'weight loss', 
-                         'cardio', 'strength', 'yoga', 'kashrot', 'byayam', 'training',
-                         'jogging', 'walking', 'swimming', 'cycling', 'sport', 'activity',
-                         'physical', 'movement', 'hiit', 'aerobic', 'anaerobic']
-    steps_keywords = ['step', 'steps', 'walk', 'walking', 'daily walk', 'pedestrian',
-                      'stroll', 'pace', 'gait', 'stride', 'foot']
+            'category': 'greeting',
+            'cache_key': ('greeting',)
+        }
     
     # Pregnancy queries
-    if any(word in message_lower for word in pregnancy_keywords):
-        pregnancy_info = handle_pregnancy_query(message_lower, user_profile)
+    if 'pregnancy' in domains:
+        pregnancy_info = handle_pregnancy_query(message_lower, user_profile, models)
         if pregnancy_info:
-            return jsonify({
-                'message': message,
+            return {
                 'response': pregnancy_info['answer'],
                 'confidence': pregnancy_info['confidence'],
-                'category': 'pregnancy'
-            })
+                'category': 'pregnancy',
+                'cache_key': pregnancy_info.get('cache_key')
+            }
     
     # Women's health queries
-    if any(word in message_lower for word in womens_health_keywords):
-        womens_info = handle_womens_health_query(message_lower, user_profile)
+    if 'womens_health' in domains:
+        womens_info = handle_womens_health_query(message_lower, user_profile, models)
         if womens_info:
-            return jsonify({
-                'message': message,
+            return {
                 'response': womens_info['answer'],
                 'confidence': womens_info['confidence'],
-                'category': 'womens_health'
-            })
+                'category': 'womens_health',
+                'cache_key': womens_info.get('cache_key')
+            }
     
     # Nutrition queries
-    if any(word in message_lower for word in nutrition_keywords):
+    if 'nutrition' in domains:
         if user_profile:
             age = user_profile.get('age', 25)
             gender = user_profile.get('gender', 'male')
@@ -378,7 +776,7 @@ def chat():
             activity = user_profile.get('activity_level', 'moderate')
             
             calories = get_calorie_needs(age, gender, weight, height, activity)
-            water = get_daily_water(weight)
+            water = get_daily_water(weight, models)
             
             response_text = f"🥗 **Nutrition Advice:**\n\n" \
                           f"📊 Daily calorie needs: {calories} kcal\n" \
@@ -400,15 +798,15 @@ def chat():
                           "• Hydration: 8-10 glasses of water daily\n\n" \
                           "💡 Update your profile for personalized recommendations!"
         
-        return jsonify({
-            'message': message,
+        return {
             'response': response_text,
             'confidence': 0.85,
-            'category': 'nutrition'
-        })
+            'category': 'nutrition',
+            'cache_key': None if user_profile else ('nutrition',)
+        }
     
     # Steps and walking queries
-    if any(word in message_lower for word in steps_keywords):
+    if 'steps' in domains:
         response_text = '👣 **Daily Steps Recommendations:**\n\n' \
                       '**Step Targets:**\n' \
                       '• Minimum: 5,000 steps (sedentary prevention)\n' \
@@ -429,16 +827,17 @@ def chat():
                       '• Use fitness tracker to monitor progress\n\n' \
                       '💡 Even 5,000 steps is better than sedentary! Every step counts!'
         
-        return jsonify({
-            'message': message,
+        return {
             'response': response_text,
             'confidence': 0.95,
-            'category': 'exercise'
-        })
+            'category': 'exercise',
+            'cache_key': ('steps',)
+        }
     
     # Exercise queries
-    if any(word in message_lower for word in exercise_keywords):
-        if user_profile and user_profile.get('activity_level'):
+    if 'exercise' in domains:
+        personalized = bool(user_profile and user_profile.get('activity_level'))
+        if personalized:
             activity = user_profile.get('activity_level', 'moderate')
             response_text = f"💪 **Exercise Recommendations:**\n\n" \
                           f"Based on your {activity} activity level:\n\n" \
@@ -466,29 +865,219 @@ def chat():
                           "• Yoga, stretching (flexibility)\n\n" \
                           "💡 Update your profile for personalized plans!"
         
-        return jsonify({
-            'message': message,
+        return {
             'response': response_text,
             'confidence': 0.85,
-            'category': 'exercise'
-        })
+            'category': 'exercise',
+            'cache_key': None if personalized else ('exercise',)
+        }
     
-    # General health questions - use Q&A model
-    result = answer_question(message, user_profile)
+    return None
+
+
+def check_profile(profile):
+    """(profile with null fields dropped, None), or (None, error message) when it can't be used"""
+    if profile is None:
+        return None, None
+    if not isinstance(profile, dict):
+        return None, 'profile must be an object'
     
+    profile = {field: value for field, value in profile.items() if value is not None}
+    for field in PROFILE_NUMBER_FIELDS:
+        value = profile.get(field)
+        if value is None:
+            continue
+        # bool is an int subclass; "70" would fail later inside the arithmetic
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value <= 0:
+            return None, f"profile '{field}' must be a positive number"
+    for field in PROFILE_TEXT_FIELDS:
+        if field in profile and not isinstance(profile[field], str):
+            return None, f"profile '{field}' must be a string"
+    return profile, None
+
+
+def qa_reply(message, result, user_profile, models):
+    """Shape a Q&A model result as a chat reply"""
     # Add BMI info if profile available and relevant
     if user_profile and user_profile.get('weight') and user_profile.get('height'):
-        if any(word in message_lower for word in ['bmi', 'weight', 'healthy', 'swasthyo']):
+        if 'bmi' in CHAT_KEYWORDS.match(message):
             bmi = get_bmi(user_profile['weight'], user_profile['height'] / 100)
-            bmi_info = get_bmi_category(bmi)
+            bmi_info = get_bmi_category(bmi, models)
             if bmi_info:
                 result['answer'] += f"\n\n📊 Your BMI: {bmi:.1f} ({bmi_info['category']}) - {bmi_info['advice']}"
     
-    return jsonify({
-        'message': message,
+    return {
         'response': result['answer'],
         'confidence': result['confidence'],
         'category': result['category']
+    }
+
+
+# API Routes
+
+@app.route('/')
+def home():
+    """API home endpoint"""
+    return jsonify({
+        'message': 'HealthNest AI Backend API',
+        'version': '1.0.0',
+        'status': 'running',
+        'endpoints': {
+            '/chat': 'POST - Chat with health assistant',
+            '/chat/batch': 'POST - Answer many chat messages at once',
+            '/health-check': 'POST - Get personalized health analysis',
+            '/health-check/batch': 'POST - Health metrics for a whole roster (JSON or CSV)',
+            '/predict-calories': 'POST - Predict food calories',
+            '/predict-calories/batch': 'POST - Predict calories for a food log (JSON or NDJSON) with meal totals',
+            '/recommend-exercise': 'POST - Get exercise recommendations',
+            '/pregnancy-info': 'GET - Get pregnancy week info',
+            '/health': 'GET - API health status',
+            '/metrics': 'GET - Prometheus metrics'
+        }
+    })
+
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    """Check API health"""
+    models = model_store.current
+    return jsonify({
+        'status': 'healthy',
+        'models_loaded': {
+            'qa_model': models.qa_vectorizer is not None,
+            'calorie_predictor': models.has_calorie_model,
+            'exercise_recommender': models.exercise_recommender is not None,
+            'knowledge_base': bool(models.health_knowledge)
+        },
+        'models_version': model_store.version,
+        'models_source': models.source,
+        'qa_cache': QA_CACHE.stats(),
+        'qa_singleflight': QA_FLIGHTS.stats()
+    })
+
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """Load models from ../models in the background and swap them in"""
+    if not token_authorized(ADMIN_TOKEN):
+        return jsonify({'error': 'Admin token required'}), 403
+    
+    if not model_store.reload('admin'):
+        return jsonify({'error': 'A reload is already running'}), 409
+    
+    # ?wait=1 blocks until the new set is live (or rejected)
+    if request.args.get('wait') == '1':
+        model_store.wait()
+        return jsonify({'version': model_store.version, 'reload': model_store.history[-1]})
+    
+    return jsonify({'status': 'reloading', 'version': model_store.version}), 202
+
+
+@app.route('/admin/models', methods=['GET'])
+def admin_models():
+    """Live model version and recent reload reports"""
+    if not token_authorized(ADMIN_TOKEN):
+        return jsonify({'error': 'Admin token required'}), 403
+    
+    return jsonify({
+        'version': model_store.version,
+        'reloading': model_store.reloading,
+        'reloads': list(model_store.history)
+    })
+
+
+@app.route('/chat', methods=['POST'])
+def chat():
+    """Main chatbot endpoint with improved understanding"""
+    data = request.json
+    
+    if not data or 'message' not in data:
+        return jsonify({'error': 'No message provided'}), 400
+    
+    message = data['message'].strip()
+    user_profile, error = check_profile(data.get('profile', None))
+    if error:
+        return jsonify({'error': error}), 400
+    # One model set for the whole request, even if a reload swaps it meanwhile
+    models = model_store.current
+    
+    with METRICS.stage('keyword_routing'):
+        reply = route_message(message, user_profile, models)
+    
+    # General health questions - use Q&A model
+    if reply is None:
+        result = answer_question(message, user_profile, models=models)
+        reply = qa_reply(message, result, user_profile, models)
+    METRICS.count_chat(reply.get('category', 'unknown'), message_language(message))
+    
+    # Static answers are stored serialized; only the echoed message is spliced in
+    with METRICS.stage('serialize'):
+        cache_key = reply.pop('cache_key', None)
+        if cache_key is not None:
+            return RESPONSE_CACHE.respond(cache_key, lambda: reply, dynamic={'message': message})
+        
+        return jsonify({'message': message, **reply})
+
+
+@app.route('/chat/batch', methods=['POST'])
+def chat_batch():
+    """Answer a list of {message, profile} items in one request"""
+    started = time.perf_counter()
+    data = request.json
+    
+    # Accept either a bare array or {"items": [...]}
+    items = data.get('items') if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return jsonify({'error': 'Expected a list of {message, profile} items'}), 400
+    if len(items) > CHAT_BATCH_MAX_ITEMS:
+        return jsonify({'error': f'Too many items (max {CHAT_BATCH_MAX_ITEMS})'}), 413
+    
+    # Keyword routing per item; collect the fall-through questions
+    models = model_store.current
+    results = [None] * len(items)
+    pending = []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get('message'), str):
+            results[i] = {'error': 'No message provided'}
+            continue
+        user_profile, error = check_profile(item.get('profile', None))
+        if error:
+            results[i] = {'error': error}
+            continue
+        
+        message = item['message'].strip()
+        reply = route_message(message, user_profile, models)
+        if reply is None:
+            pending.append((i, message, user_profile))
+        else:
+            reply.pop('cache_key', None)
+            results[i] = {'message': message, **reply}
+    routed = time.perf_counter()
+    
+    # One vectorized TF-IDF pass for every fall-through item
+    if pending:
+        if models.qa_vectorizer is None or models.qa_database is None:
+            all_matches = None
+        else:
+            all_matches = search_questions([message for _, message, _ in pending], models=models)
+        
+        for n, (i, message, user_profile) in enumerate(pending):
+            if all_matches is None:
+                result = answer_question(message, user_profile, models=models)
+            else:
+                result = build_answer(all_matches[n], user_profile, models)
+            results[i] = {'message': message, **qa_reply(message, result, user_profile, models)}
+    retrieved = time.perf_counter()
+    
+    return jsonify({
+        'results': results,
+        'timing': {
+            'items': len(items),
+            'qa_items': len(pending),
+            'routing_ms': round((routed - started) * 1000, 3),
+            'retrieval_ms': round((retrieved - routed) * 1000, 3),
+            'total_ms': round((time.perf_counter() - started) * 1000, 3)
+        }
     })
 
 
@@ -506,11 +1095,12 @@ def complete_health_check():
     weight = data['weight']  # kg
     height = data['height']  # cm
     activity = data.get('activity', 'moderate')
+    models = model_store.current
     
     # Calculate metrics
     bmi = get_bmi(weight, height / 100)
-    bmi_info = get_bmi_category(bmi)
-    water = get_daily_water(weight)
+    bmi_info = get_bmi_category(bmi, models)
+    water = get_daily_water(weight, models)
     calories = get_calorie_needs(age, gender, weight, height, activity)
     
     # Determine step goal
@@ -552,6 +1142,101 @@ def complete_health_check():
     })
 
 
+def numeric_column(values):
+    """A roster column as a 1-D float array; entries that aren't plain numbers become NaN"""
+    try:
+        column = np.asarray(values, dtype=float)
+        if column.ndim == 1:
+            return column
+    except (TypeError, ValueError):
+        pass
+    
+    # Slow path only for bad input: find out which rows are at fault
+    column = np.full(len(values), np.nan)
+    for i, value in enumerate(values):
+        if isinstance(value, (int, float, str)) and not isinstance(value, bool):
+            try:
+                column[i] = float(value)
+            except ValueError:
+                pass
+    return column
+
+
+def read_cohort_columns():
+    """Roster columns from a CSV upload/body, a JSON array of profiles or a JSON object of columns"""
+    upload = request.files.get('file')
+    if upload is not None or request.mimetype == 'text/csv':
+        text = upload.read().decode('utf-8-sig') if upload is not None else request.get_data(as_text=True)
+        reader = csv.reader(io.StringIO(text))
+        header = [name.strip() for name in next(reader, [])]
+        rows = [row for row in reader if row]
+        return {name: [row[i] if i < len(row) else None for row in rows] for i, name in enumerate(header)}
+    
+    data = request.get_json(silent=True)
+    if isinstance(data, dict) and isinstance(data.get('profiles'), list):
+        data = data['profiles']
+    if isinstance(data, list):
+        fields = ['id', 'age', 'gender', 'weight', 'height', 'activity']
+        return {field: [row.get(field) if isinstance(row, dict) else None for row in data] for field in fields}
+    if isinstance(data, dict):
+        return data
+    return None
+
+
+@app.route('/health-check/batch', methods=['POST'])
+def cohort_health_check():
+    """Health analysis for a whole roster, computed column-wise with NumPy"""
+    started = time.perf_counter()
+    columns = read_cohort_columns()
+    
+    if columns is None:
+        return jsonify({'error': 'Expected a JSON array of profiles, JSON columns or a CSV upload'}), 400
+    
+    required_fields = ['age', 'gender', 'weight', 'height']
+    missing = [field for field in required_fields if columns.get(field) is None]
+    if missing:
+        return jsonify({'error': f"Missing required fields: {', '.join(missing)}"}), 400
+    
+    # Every column, optional ones included, must be a list with one value per row
+    fields = required_fields + [field for field in ('activity', 'id') if columns.get(field) is not None]
+    for field in fields:
+        if not isinstance(columns[field], list):
+            return jsonify({'error': f"'{field}' must be a list of values"}), 400
+    count = len(columns['age'])
+    for field in fields:
+        if len(columns[field]) != count:
+            return jsonify({'error': f"'{field}' has {len(columns[field])} values, expected {count}"}), 400
+    if count > HEALTH_CHECK_BATCH_MAX_ROWS:
+        return jsonify({'error': f'Too many rows (max {HEALTH_CHECK_BATCH_MAX_ROWS})'}), 413
+    
+    activity = columns.get('activity') or [None] * count
+    activity = [level if level else 'moderate' for level in activity]
+    
+    numbers = {field: numeric_column(columns[field]) for field in COHORT_LIMITS}
+    # NaN and inf fail both comparisons, so out-of-range covers them too
+    invalid = np.zeros(count, dtype=bool)
+    for field, (low, high) in COHORT_LIMITS.items():
+        invalid |= ~((numbers[field] > low) & (numbers[field] <= high))
+    age, weight, height = numbers['age'], numbers['weight'], numbers['height']
+    
+    bad_text = [i for i, gender in enumerate(columns['gender']) if not gender or not isinstance(gender, str)]
+    bad_text += [i for i, level in enumerate(activity) if not isinstance(level, str)]
+    if invalid.any() or bad_text:
+        rows = sorted(set(np.flatnonzero(invalid).tolist()) | set(bad_text))
+        return jsonify({'error': 'Invalid or missing values', 'rows': rows[:100]}), 400
+    
+    metrics = get_cohort_metrics(age, columns['gender'], weight, height, activity, model_store.current)
+    
+    result = {
+        'count': count,
+        'metrics': {name: values.tolist() for name, values in metrics.items()},
+        'timing_ms': round((time.perf_counter() - started) * 1000, 3)
+    }
+    if columns.get('id') is not None and any(value is not None for value in columns['id']):
+        result['ids'] = columns['id']
+    return jsonify(result)
+
+
 @app.route('/predict-calories', methods=['POST'])
 def predict_calories():
     """Predict calories from macros"""
@@ -560,7 +1245,8 @@ def predict_calories():
     if not data or not all(k in data for k in ['protein', 'carbs', 'fat']):
         return jsonify({'error': 'Missing protein, carbs, or fat values'}), 400
     
-    if calorie_predictor is None:
+    models = model_store.current
+    if not models.has_calorie_model:
         return jsonify({'error': 'Calorie predictor not available'}), 503
     
     protein = data['protein']
@@ -569,7 +1255,7 @@ def predict_calories():
     
     # Predict
     X = np.array([[protein, carbs, fat]])
-    predicted_calories = calorie_predictor.predict(X)[0]
+    predicted_calories = predict_calorie_rows(X, models)[0]
     
     return jsonify({
         'protein_g': protein,
@@ -579,6 +1265,101 @@ def predict_calories():
     })
 
 
+def read_food_log():
+    """Food entries from a JSON array, {"items": [...]} or an NDJSON stream"""
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        # Parsed lazily so very large logs are never held in memory as a whole
+        return (json.loads(line) for line in request.stream if line.strip())
+    
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('items')
+    return data if isinstance(data, list) else None
+
+
+@app.route('/predict-calories/batch', methods=['POST'])
+def predict_calories_batch():
+    """Predict calories for many foods at once and total them per meal"""
+    started = time.perf_counter()
+    
+    models = model_store.current
+    if not models.has_calorie_model:
+        return jsonify({'error': 'Calorie predictor not available'}), 503
+    
+    entries = read_food_log()
+    if entries is None:
+        return jsonify({'error': 'Expected a list of {protein, carbs, fat} items'}), 400
+    
+    include_items = request.args.get('items') != '0'
+    items = []
+    meals = {}
+    count = 0
+    entries = iter(entries)
+    
+    while True:
+        try:
+            chunk = list(islice(entries, CALORIE_BATCH_CHUNK_ROWS))
+        except ValueError:
+            return jsonify({'error': f'Invalid JSON line after item {count}'}), 400
+        if not chunk:
+            break
+        
+        try:
+            X = np.array([[entry['protein'], entry['carbs'], entry['fat']] for entry in chunk], dtype=float)
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'error': f'Missing protein, carbs, or fat values in items {count}-{count + len(chunk) - 1}'}), 400
+        
+        # "nan" and "inf" parse as floats but would poison every total
+        invalid = np.flatnonzero(~np.isfinite(X).all(axis=1)) if X.ndim == 2 else np.arange(len(chunk))
+        if len(invalid):
+            return jsonify({'error': 'protein, carbs and fat must be finite numbers',
+                            'items': (invalid + count).tolist()[:100]}), 400
+        
+        # One prediction call for the whole chunk
+        calories = np.rint(predict_calorie_rows(X, models)).astype(int)
+        
+        for offset, (entry, row, kcal) in enumerate(zip(chunk, X.tolist(), calories.tolist())):
+            meal = entry.get('meal')
+            meal = 'unassigned' if meal is None else str(meal)
+            totals = meals.setdefault(meal, {'items': 0, 'protein_g': 0.0, 'carbs_g': 0.0, 'fat_g': 0.0, 'predicted_calories': 0})
+            totals['items'] += 1
+            totals['protein_g'] += row[0]
+            totals['carbs_g'] += row[1]
+            totals['fat_g'] += row[2]
+            totals['predicted_calories'] += kcal
+            
+            if include_items:
+                items.append({
+                    'index': count + offset,
+                    'name': entry.get('name'),
+                    'meal': meal,
+                    'protein_g': row[0],
+                    'carbs_g': row[1],
+                    'fat_g': row[2],
+                    'predicted_calories': kcal
+                })
+        count += len(chunk)
+    
+    total = {'items': count, 'protein_g': 0.0, 'carbs_g': 0.0, 'fat_g': 0.0, 'predicted_calories': 0}
+    for totals in meals.values():
+        for key in ('protein_g', 'carbs_g', 'fat_g'):
+            totals[key] = round(totals[key], 1)
+        for key in total:
+            if key != 'items':
+                total[key] += totals[key]
+    for key in ('protein_g', 'carbs_g', 'fat_g'):
+        total[key] = round(total[key], 1)
+    
+    result = {
+        'meals': meals,
+        'total': total,
+        'timing_ms': round((time.perf_counter() - started) * 1000, 3)
+    }
+    if include_items:
+        result['items'] = items
+    return jsonify(result)
+
+
 @app.route('/recommend-exercise', methods=['POST'])
 def recommend_exercise():
     """Recommend exercises based on user data"""
@@ -627,6 +1408,7 @@ def pregnancy_info():
     if not week or week < 1 or week > 42:
         return jsonify({'error': 'Invalid week number (1-42)'}), 400
     
+    health_knowledge = model_store.current.health_knowledge
     if 'pregnancy' not in health_knowledge:
         return jsonify({'error': 'Pregnancy data not available'}), 503
     
@@ -0,0 +1,165 @@
+"""
+HealthNest AI - Async (ASGI) API
+Serves /chat, /health-check, /predict-calories and /recommend-exercise
+from app.py on an asyncio event loop. Connections and request bodies are
+handled on the loop; the route handlers themselves (TF-IDF retrieval,
+forest inference) run in a bounded thread pool, so idle clients cost no
+thread. Responses are produced by the same Flask views, byte for byte.
+
+Run with any ASGI server, e.g.:
+    pip install uvicorn
+    uvicorn app_async:app --host 0.0.0.0 --port 5000
+"""
+
+import asyncio
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from app import app as flask_app
+
+# Routes exposed on the event loop; everything else stays on the Flask app
+ASYNC_ROUTES = {'/chat', '/health-check', '/predict-calories', '/recommend-exercise'}
+ASYNC_METHODS = {'POST', 'OPTIONS'}
+
+# Handlers running at once, and requests allowed to wait for one
+ASYNC_EXECUTOR_WORKERS = os.cpu_count() or 4
+ASYNC_MAX_PENDING = 256
+ASYNC_MAX_BODY_BYTES = 1024 * 1024
+
+executor = ThreadPoolExecutor(max_workers=ASYNC_EXECUTOR_WORKERS, thread_name_prefix='healthnest-async')
+pending = 0
+
+
+def build_environ(scope, body):
+    """Minimal WSGI environ for one ASGI HTTP request"""
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    client_host, client_port = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'],
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client_host,
+        'REMOTE_PORT': str(client_port),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': io.StringIO(),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False
+    }
+
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f'HTTP_{name}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+def dispatch(environ):
+    """Run the Flask view (with CORS and error handling) in a worker thread"""
+    with flask_app.request_context(environ):
+        response = flask_app.full_dispatch_request()
+        return response.status_code, response.headers.to_wsgi_list(), response.get_data()
+
+
+async def read_body(receive):
+    """Request body, or None once it grows past ASYNC_MAX_BODY_BYTES"""
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return b''
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > ASYNC_MAX_BODY_BYTES:
+            return None
+        chunks.append(chunk)
+        if not message.get('more_body', False):
+            return b''.join(chunks)
+
+
+async def send_response(send, status, headers, body):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_error(send, status, message, extra_headers=()):
+    body = ('{"error":"%s"}\n' % message).encode('utf-8')
+    headers = [('Content-Type', 'application/json'), ('Content-Length', str(len(body))), *extra_headers]
+    await send_response(send, status, headers, body)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            executor.shutdown(wait=True)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    global pending
+
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    if scope['path'] not in ASYNC_ROUTES:
+        await send_error(send, 404, 'Not found')
+        return
+    if scope['method'] not in ASYNC_METHODS:
+        await send_error(send, 405, 'Method not allowed', [('Allow', 'OPTIONS, POST')])
+        return
+
+    body = await read_body(receive)
+    if body is None:
+        await send_error(send, 413, 'Request body too large')
+        return
+
+    # Shed load instead of queueing without bound behind busy workers
+    if pending >= ASYNC_MAX_PENDING:
+        await send_error(send, 503, 'Server busy, please retry', [('Retry-After', '1')])
+        return
+
+    pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        status, headers, response_body = await loop.run_in_executor(executor, dispatch, build_environ(scope, body))
+    finally:
+        pending -= 1
+
+    await send_response(send, status, headers, response_body)
+
+
+if __name__ == '__main__':
+    try:
+        import uvicorn
+    except ImportError:
+        print("⚠️  uvicorn is not installed: pip install uvicorn")
+        print("   Or run: uvicorn app_async:app --host 0.0.0.0 --port 5000")
+    else:
+        print("🚀 HealthNest AI Async API Starting...")
+        print("📡 Server: http://localhost:5000")
+        uvicorn.run(app, host='0.0.0.0', port=5000)
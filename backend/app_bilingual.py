@@ -9,10 +9,22 @@ from flask_cors import CORS
 import math
 import re
 from datetime import datetime
+from keyword_matcher import KeywordMatcher, normalize_text
+from response_cache import ResponseCache
+from query_cache import QueryCache, normalize_query
+from metrics import Instrumentation
+from profiling import RequestProfiler, SamplingProfiler
 
 app = Flask(__name__)
 CORS(app)
 
+METRICS = Instrumentation('app_bilingual')
+METRICS.install(app)
+PROFILER = RequestProfiler('app_bilingual')
+PROFILER.install(app)
+SAMPLER = SamplingProfiler('app_bilingual')
+SAMPLER.install(app)
+
 # ==================== LANGUAGE DETECTION ====================
 
 def detect_language(text):
@@ -1060,21 +1072,101 @@ def calculate_water_intake(weight_kg):
     """Calculate daily water requirement in liters"""
     return round((weight_kg * 35) / 1000, 1)
 
+# ==================== TOPIC INDEX ====================
+
+# Question words are listed as app_info keywords but appear in almost every
+# question, so they only decide the topic when nothing more specific matches
+QUESTION_WORDS = {
+    'bn': {'কি', 'কেন', 'কিভাবে', 'ব্যবহার'},
+    'en': {'what', 'why', 'how', 'use'}
+}
+QUESTION_WORD_WEIGHT = 0.25
+
+def build_topic_index(knowledge, language):
+    """Compile one language's keywords into a matcher with per-keyword specificity weights"""
+    keywords_key = f'keywords_{language}'
+    response_key = f'response_{language}'
+    
+    groups = {topic: data[keywords_key] for topic, data in knowledge.items() if keywords_key in data}
+    responses = [normalize_text(data.get(response_key, '')) for data in knowledge.values()]
+    
+    # A keyword that shows up in many topics' answers ("healthnest", "মা") is
+    # generic; weight it down the same way TF-IDF does so specific keywords win
+    weights = {}
+    for topic, keywords in groups.items():
+        for keyword in keywords:
+            keyword = normalize_text(keyword)
+            if keyword in QUESTION_WORDS.get(language, ()):
+                weights[(topic, keyword)] = QUESTION_WORD_WEIGHT
+                continue
+            df = sum(keyword in response for response in responses)
+            weights[(topic, keyword)] = math.log((1 + len(responses)) / (1 + df)) + 1
+    
+    return {
+        # Bengali suffixes attach to the word, so only English needs word boundaries
+        'matcher': KeywordMatcher(groups, whole_words=(language == 'en')),
+        'weights': weights,
+        'order': {topic: i for i, topic in enumerate(groups)}
+    }
+
+
+TOPIC_INDEX = {language: build_topic_index(HEALTH_KNOWLEDGE, language) for language in ('bn', 'en')}
+
+# Serialized JSON (plain + gzip) for each (topic, language) answer
+RESPONSE_CACHE = ResponseCache()
+
+# Matched topic per (normalized message, language)
+TOPIC_CACHE = QueryCache(max_entries=4096, ttl=600)
+
+METRICS.track_cache('topics', TOPIC_CACHE.stats)
+METRICS.track_cache('static_responses', RESPONSE_CACHE.stats)
+
 # ==================== TOPIC MATCHING FUNCTION ====================
 
+def find_best_topic(question, language='bn'):
+    """Return the topic whose matched keywords carry the most weight, or None"""
+    query = normalize_query(question)
+    return TOPIC_CACHE.get_or_compute((query, language), lambda: score_topics(query, language))
+
+
+def score_topics(question, language):
+    """Uncached topic scoring behind find_best_topic"""
+    index = TOPIC_INDEX.get(language)
+    if index is None:
+        return None
+    
+    scores = {}
+    seen = set()
+    for topic, keyword, _ in index['matcher'].find_all(question):
+        if (topic, keyword) in seen:
+            continue
+        seen.add((topic, keyword))
+        scores[topic] = scores.get(topic, 0.0) + index['weights'][(topic, keyword)]
+    
+    if not scores:
+        return None
+    # Ties go to the topic listed first in HEALTH_KNOWLEDGE
+    return max(scores, key=lambda topic: (scores[topic], -index['order'][topic]))
+
+
 def find_best_match(question, language='bn'):
     """Find the best matching health topic based on keywords"""
-    question_lower = question.lower()
-    
-    # Check each topic
-    for topic, data in HEALTH_KNOWLEDGE.items():
-        keywords_key = f'keywords_{language}'
-        if keywords_key in data:
-            # Check if any keyword matches
-            for keyword in data[keywords_key]:
-                if keyword.lower() in question_lower:
-                    response_key = f'response_{language}'
-                    return data.get(response_key, data.get('response_bn', ''))
+    return topic_answer(find_best_topic(question, language), language)
+
+
+def topic_payload(topic, language):
+    """Static JSON body for a topic's answer (None: the fallback answer)"""
+    return {
+        "response": topic_answer(topic, language),
+        "detected_language": "Bengali" if language == 'bn' else "English"
+    }
+
+
+def topic_answer(topic, language):
+    """Answer text for a topic, or the fallback when topic is None"""
+    if topic is not None:
+        data = HEALTH_KNOWLEDGE[topic]
+        return data.get(f'response_{language}', data.get('response_bn', ''))
     
     # Default response if no match found
     if language == 'bn':
@@ -1129,6 +1221,11 @@ def home():
             "15 health topics",
             "Personalized calculations"
         ],
+        "endpoints": {
+            "chat": "POST /chat",
+            "topic": "GET /topics/<topic>?lang=bn|en",
+            "health": "GET /health"
+        },
         "status": "running"
     })
 
@@ -1137,6 +1234,7 @@ def health():
     return jsonify({
         "status": "healthy",
         "models_loaded": True,
+        "topic_cache": TOPIC_CACHE.stats(),
         "timestamp": datetime.now().isoformat()
     })
 
@@ -1150,20 +1248,40 @@ def chat():
             return jsonify({"error": "No message provided"}), 400
         
         # Detect language
-        lang = detect_language(message)
+        with METRICS.stage('detect_language'):
+            lang = detect_language(message)
         
-        # Find best matching response
-        response = find_best_match(message, lang)
+        # Find best matching topic; its answer is served pre-serialized
+        with METRICS.stage('match'):
+            topic = find_best_topic(message, lang)
+        METRICS.count_chat(topic or 'default', lang)
         
-        return jsonify({
-            "response": response,
-            "detected_language": "Bengali" if lang == 'bn' else "English",
-            "timestamp": datetime.now().isoformat()
-        })
+        # Clients that don't need the timestamp (?timestamp=0) get the
+        # precompressed body as-is
+        timestamp = None if request.args.get('timestamp') == '0' else datetime.now().isoformat()
+        
+        with METRICS.stage('serialize'):
+            return RESPONSE_CACHE.respond(
+                (topic or 'default', lang),
+                lambda: topic_payload(topic, lang),
+                dynamic={"timestamp": timestamp}
+            )
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/topics/<topic>', methods=['GET'])
+def get_topic(topic):
+    """Static answer for one topic; cacheable, so it carries an ETag and gzip"""
+    lang = request.args.get('lang', 'bn')
+    if lang not in TOPIC_INDEX:
+        return jsonify({"error": "lang must be 'bn' or 'en'"}), 400
+    if topic not in HEALTH_KNOWLEDGE:
+        return jsonify({"error": f"Unknown topic '{topic}'"}), 404
+    
+    # Same cache entry as /chat, so both serve identical bytes
+    return RESPONSE_CACHE.respond((topic, lang), lambda: topic_payload(topic, lang))
+
 if __name__ == '__main__':
     print("🚀 Starting HealthNest Bilingual AI Chatbot...")
     print("🌐 Listening on http://192.168.0.108:5000")
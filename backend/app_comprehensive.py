@@ -8,10 +8,20 @@ from flask_cors import CORS
 import math
 import re
 from datetime import datetime
+from functools import cached_property
+from metrics import Instrumentation
+from profiling import RequestProfiler, SamplingProfiler
 
 app = Flask(__name__)
 CORS(app)
 
+METRICS = Instrumentation('app_comprehensive')
+METRICS.install(app)
+PROFILER = RequestProfiler('app_comprehensive')
+PROFILER.install(app)
+SAMPLER = SamplingProfiler('app_comprehensive')
+SAMPLER.install(app)
+
 # ==================== LANGUAGE DETECTION ====================
 
 def detect_language(text):
@@ -427,311 +437,332 @@ def calculate_step_goal(age, fitness_level='moderate'):
 
 # ==================== AI RESPONSE GENERATION ====================
 
-def get_comprehensive_response(message, profile=None):
-    """Generate comprehensive AI response based on message and user profile"""
+class ProfileMetrics:
+    """User profile values with health metrics computed on first use"""
     
-    message_lower = message.lower()
+    def __init__(self, profile=None):
+        self.age = profile.get('age', 25) if profile else 25
+        self.gender = profile.get('gender', 'unknown') if profile else 'unknown'
+        self.weight = profile.get('weight', 70) if profile else 70
+        self.height = profile.get('height', 170) if profile else 170
+        self.activity = profile.get('activity', 'moderate') if profile else 'moderate'
     
-    # Initialize profile data
-    age = profile.get('age', 25) if profile else 25
-    gender = profile.get('gender', 'unknown') if profile else 'unknown'
-    weight = profile.get('weight', 70) if profile else 70
-    height = profile.get('height', 170) if profile else 170
-    activity = profile.get('activity', 'moderate') if profile else 'moderate'
-    
-    # Calculate metrics
-    bmi, bmi_cat = calculate_bmi(weight, height)
-    bmr = calculate_bmr(age, gender, weight, height)
-    tdee = calculate_tdee(bmr, activity)
-    water = calculate_water_intake(weight)
-    steps = calculate_step_goal(age, activity)
-    
-    # ==================== APP INFORMATION QUERIES ====================
-    
-    if any(word in message_lower for word in ['কি', 'what is healthnest', 'app', 'অ্যাপ', 'healthnest কী', 'কেন ব্যবহার']):
-        if 'কেন' in message_lower or 'why' in message_lower or 'ব্যবহার' in message_lower:
-            response = f"🏥 **HealthNest কেন ব্যবহার করবেন?**\n\n{HEALTH_KNOWLEDGE['app_info']['purpose']}\n\n"
-            response += "**প্রধান সুবিধা:**\n"
-            for benefit in HEALTH_KNOWLEDGE['app_info']['why_use']:
-                response += f"{benefit}\n"
-            return response
-        
-        if 'কিভাবে' in message_lower or 'how to use' in message_lower or 'ব্যবহার' in message_lower:
-            response = "📱 **HealthNest কিভাবে ব্যবহার করবেন?**\n\n"
-            for step in HEALTH_KNOWLEDGE['app_info']['how_to_use']:
-                response += f"{step}\n"
-            response += "\n**আপনার সুবিধা:**\n"
-            for benefit in HEALTH_KNOWLEDGE['app_info']['user_benefits']:
-                response += f"{benefit}\n"
-            return response
-    
-    # ==================== BMI QUERIES ====================
-    
-    if any(word in message_lower for word in ['bmi', 'বিএমআই', 'body mass']):
-        response = f"📊 **আপনার BMI বিশ্লেষণ:**\n\n"
-        response += f"**আপনার BMI:** {bmi} ({bmi_cat})\n"
-        response += f"বয়স: {age} বছর | ওজন: {weight}kg | উচ্চতা: {height}cm\n\n"
-        
-        response += f"**BMI কি?**\n{HEALTH_KNOWLEDGE['bmi']['what_is']}\n\n"
-        response += f"**ফর্মুলা:** {HEALTH_KNOWLEDGE['bmi']['formula']}\n\n"
-        
-        response += "**BMI ক্যাটাগরি:**\n"
-        for cat, desc in HEALTH_KNOWLEDGE['bmi']['categories'].items():
-            response += f"• {desc}\n"
-        
-        response += f"\n**পরামর্শ:**\n"
-        for tip in HEALTH_KNOWLEDGE['bmi']['tips']:
-            response += f"✓ {tip}\n"
-        
-        response += f"\n💡 {HEALTH_KNOWLEDGE['bmi']['how_to_calculate']}"
-        return response
+    @cached_property
+    def bmi_result(self):
+        return calculate_bmi(self.weight, self.height)
     
-    # ==================== WEIGHT LOSS QUERIES ====================
+    @property
+    def bmi(self):
+        return self.bmi_result[0]
     
-    if any(word in message_lower for word in ['weight loss', 'ওজন কমা', 'lose weight', 'slim', 'fat']):
-        target_calories = tdee - 500
-        response = f"🎯 **আপনার ওজন কমানোর পরিকল্পনা:**\n\n"
-        response += f"**বর্তমান অবস্থা:**\n"
-        response += f"• ওজন: {weight}kg\n"
-        response += f"• BMI: {bmi} ({bmi_cat})\n"
-        response += f"• দৈনিক ক্যালোরি প্রয়োজন: {tdee} kcal\n"
-        response += f"• **ওজন কমাতে লক্ষ্য:** {target_calories} kcal/দিন\n\n"
-        
-        response += f"{HEALTH_KNOWLEDGE['weight_loss']['general']}\n\n"
-        response += f"**নিরাপদ হার:** {HEALTH_KNOWLEDGE['weight_loss']['safe_rate']}\n\n"
-        
-        response += "**পরামর্শ:**\n"
-        for tip in HEALTH_KNOWLEDGE['weight_loss']['tips']:
-            response += f"{tip}\n"
-        
-        response += "\n**খাবার পরিকল্পনা:**\n"
-        for meal, food in HEALTH_KNOWLEDGE['weight_loss']['diet_plan'].items():
-            response += f"• {meal.title()}: {food}\n"
-        
-        return response
+    @property
+    def bmi_cat(self):
+        return self.bmi_result[1]
     
-    # ==================== NUTRITION QUERIES ====================
+    @cached_property
+    def bmr(self):
+        return calculate_bmr(self.age, self.gender, self.weight, self.height)
     
-    if any(word in message_lower for word in ['nutrition', 'পুষ্টি', 'diet', 'খাবার', 'food']):
-        protein_need = round(weight * 0.8, 1)
-        response = f"🥗 **আপনার পুষ্টি পরিকল্পনা:**\n\n"
-        response += f"**দৈনিক প্রয়োজন:**\n"
-        response += f"• ক্যালোরি: {tdee} kcal\n"
-        response += f"• প্রোটিন: {protein_need}g (ওজনের 0.8g/kg)\n"
-        response += f"• পানি: {water}L\n"
-        response += f"• ফাইবার: 25-30g\n\n"
-        
-        response += f"{HEALTH_KNOWLEDGE['nutrition']['balanced_diet']}\n\n"
-        
-        response += "**ম্যাক্রোনিউট্রিয়েন্ট:**\n"
-        for macro, info in HEALTH_KNOWLEDGE['nutrition']['macros'].items():
-            response += f"• {macro.upper()}: {info}\n"
-        
-        response += "\n**খাবারের সময়:**\n"
-        for timing in HEALTH_KNOWLEDGE['nutrition']['meal_timing']:
-            response += f"• {timing}\n"
-        
-        response += f"\n💡 {HEALTH_KNOWLEDGE['nutrition']['food_tracking']}"
-        return response
+    @cached_property
+    def tdee(self):
+        return calculate_tdee(self.bmr, self.activity)
     
-    # ==================== WATER INTAKE QUERIES ====================
+    @cached_property
+    def water(self):
+        return calculate_water_intake(self.weight)
     
-    if any(word in message_lower for word in ['water', 'পানি', 'hydrat', 'drink']):
-        response = f"💧 **আপনার পানি পানের নির্দেশনা:**\n\n"
-        response += f"**আপনার জন্য:** {water}L প্রতিদিন\n"
-        response += f"(শরীরের ওজন {weight}kg × 0.033 = {water}L)\n\n"
-        
-        response += f"{HEALTH_KNOWLEDGE['water']['daily_need']}\n\n"
-        
-        response += "**পানির উপকারিতা:**\n"
-        for benefit in HEALTH_KNOWLEDGE['water']['benefits']:
+    @cached_property
+    def steps(self):
+        return calculate_step_goal(self.age, self.activity)
+
+# ==================== RESPONSE HANDLERS ====================
+
+def app_info_response(message_lower, metrics):
+    """App information queries"""
+    if 'কেন' in message_lower or 'why' in message_lower or 'ব্যবহার' in message_lower:
+        response = f"🏥 **HealthNest কেন ব্যবহার করবেন?**\n\n{HEALTH_KNOWLEDGE['app_info']['purpose']}\n\n"
+        response += "**প্রধান সুবিধা:**\n"
+        for benefit in HEALTH_KNOWLEDGE['app_info']['why_use']:
             response += f"{benefit}\n"
-        
-        response += "\n**কখন পানি পান করবেন:**\n"
-        for when in HEALTH_KNOWLEDGE['water']['when_to_drink']:
-            response += f"• {when}\n"
-        
-        response += f"\n💡 {HEALTH_KNOWLEDGE['water']['app_feature']}"
         return response
     
-    # ==================== SLEEP QUERIES ====================
-    
-    if any(word in message_lower for word in ['sleep', 'ঘুম', 'rest', 'তিদ্রা']):
-        response = f"😴 **ঘুম সম্পর্কিত তথ্য:**\n\n"
-        response += f"**আপনার বয়সের জন্য প্রয়োজন:** 7-9 ঘণ্টা\n\n"
-        
-        response += "**সকলের জন্য:**\n"
-        for age_group, hours in HEALTH_KNOWLEDGE['sleep']['daily_need'].items():
-            response += f"• {age_group.title()}: {hours}\n"
-        
-        response += "\n**ঘুমের উপকারিতা:**\n"
-        for benefit in HEALTH_KNOWLEDGE['sleep']['benefits']:
+    if 'কিভাবে' in message_lower or 'how to use' in message_lower or 'ব্যবহার' in message_lower:
+        response = "📱 **HealthNest কিভাবে ব্যবহার করবেন?**\n\n"
+        for step in HEALTH_KNOWLEDGE['app_info']['how_to_use']:
+            response += f"{step}\n"
+        response += "\n**আপনার সুবিধা:**\n"
+        for benefit in HEALTH_KNOWLEDGE['app_info']['user_benefits']:
             response += f"{benefit}\n"
-        
-        response += "\n**মান উন্নত করার উপায়:**\n"
-        for tip in HEALTH_KNOWLEDGE['sleep']['quality_tips']:
-            response += f"{tip}\n"
-        
-        response += f"\n💡 {HEALTH_KNOWLEDGE['sleep']['tracker']}"
         return response
     
-    # ==================== FITNESS & EXERCISE QUERIES ====================
+    # Not a why/how question: let the next matching topic answer
+    return None
+
+def bmi_response(message_lower, metrics):
+    """BMI queries"""
+    age, weight, height, bmi, bmi_cat = metrics.age, metrics.weight, metrics.height, metrics.bmi, metrics.bmi_cat
     
-    if any(word in message_lower for word in ['exercise', 'ব্যায়াম', 'workout', 'fitness', 'gym']):
-        response = f"💪 **আপনার ফিটনেস পরিকল্পনা:**\n\n"
-        response += f"**দৈনিক পদক্ষেপ লক্ষ্য:** {steps} steps\n"
-        response += f"**ক্যালোরি বার্ন প্রয়োজন:** {tdee} kcal/দিন\n\n"
-        
-        response += "**ব্যায়ামের ধরণ:**\n"
-        for ex_type, desc in HEALTH_KNOWLEDGE['fitness']['types'].items():
-            response += f"• {ex_type.upper()}: {desc}\n"
-        
-        response += "\n**শুরুকারীদের জন্য:**\n"
-        for week, plan in HEALTH_KNOWLEDGE['fitness']['beginner_plan'].items():
-            response += f"• {week.replace('_', ' ').title()}: {plan}\n"
-        
-        response += "\n**পরামর্শ:**\n"
-        for tip in HEALTH_KNOWLEDGE['fitness']['tips']:
-            response += f"✓ {tip}\n"
-        
-        response += f"\n💡 {HEALTH_KNOWLEDGE['fitness']['app_features']}"
-        return response
+    response = f"📊 **আপনার BMI বিশ্লেষণ:**\n\n"
+    response += f"**আপনার BMI:** {bmi} ({bmi_cat})\n"
+    response += f"বয়স: {age} বছর | ওজন: {weight}kg | উচ্চতা: {height}cm\n\n"
     
-    # ==================== PREGNANCY QUERIES ====================
+    response += f"**BMI কি?**\n{HEALTH_KNOWLEDGE['bmi']['what_is']}\n\n"
+    response += f"**ফর্মুলা:** {HEALTH_KNOWLEDGE['bmi']['formula']}\n\n"
     
-    if any(word in message_lower for word in ['pregnan', 'গর্ভ', 'মা', 'baby', 'শিশু']):
-        response = f"🤰 **গর্ভাবস্থা সম্পর্কিত তথ্য:**\n\n"
-        response += f"{HEALTH_KNOWLEDGE['pregnancy']['overview']}\n\n"
-        
-        response += "**ট্রাইমেস্টার:**\n"
-        for trimester, info in HEALTH_KNOWLEDGE['pregnancy']['trimesters'].items():
-            response += f"• {info}\n"
-        
-        response += "\n**পুষ্টি:**\n"
-        for nutrition in HEALTH_KNOWLEDGE['pregnancy']['nutrition']:
-            response += f"{nutrition}\n"
-        
-        response += "\n**নিরাপদ ব্যায়াম:**\n"
-        for exercise in HEALTH_KNOWLEDGE['pregnancy']['exercise']:
-            response += f"• {exercise}\n"
-        
-        response += f"\n💡 {HEALTH_KNOWLEDGE['pregnancy']['app_features']}"
-        return response
+    response += "**BMI ক্যাটাগরি:**\n"
+    for cat, desc in HEALTH_KNOWLEDGE['bmi']['categories'].items():
+        response += f"• {desc}\n"
     
-    # ==================== WOMEN'S HEALTH QUERIES ====================
+    response += f"\n**পরামর্শ:**\n"
+    for tip in HEALTH_KNOWLEDGE['bmi']['tips']:
+        response += f"✓ {tip}\n"
     
-    if any(word in message_lower for word in ['period', 'পিরিয়ড', 'menstrua', 'মাসিক', 'pcos', 'menopause']):
-        response = f"👩 **মহিলাদের স্বাস্থ্য:**\n\n"
-        
-        response += "**পিরিয়ড সাইকেল:**\n"
-        period = HEALTH_KNOWLEDGE['womens_health']['period']
-        response += f"• সাইকেল: {period['cycle']}\n"
-        response += f"• সময়কাল: {period['duration']}\n"
-        response += "\n**ব্যথা উপশম:**\n"
-        for relief in period['pain_relief']:
-            response += f"• {relief}\n"
-        
-        if 'pcos' in message_lower:
-            pcos = HEALTH_KNOWLEDGE['womens_health']['pcos']
-            response += f"\n**PCOS লক্ষণ:** {pcos['symptoms']}\n"
-            response += "**ব্যবস্থাপনা:**\n"
-            for manage in pcos['management']:
-                response += f"• {manage}\n"
-        
-        response += f"\n💡 {period['tracker']}"
-        return response
+    response += f"\n💡 {HEALTH_KNOWLEDGE['bmi']['how_to_calculate']}"
+    return response
+
+def weight_loss_response(message_lower, metrics):
+    """Weight loss queries"""
+    weight, bmi, bmi_cat, tdee = metrics.weight, metrics.bmi, metrics.bmi_cat, metrics.tdee
     
-    # ==================== MEDICINE QUERIES ====================
+    target_calories = tdee - 500
+    response = f"🎯 **আপনার ওজন কমানোর পরিকল্পনা:**\n\n"
+    response += f"**বর্তমান অবস্থা:**\n"
+    response += f"• ওজন: {weight}kg\n"
+    response += f"• BMI: {bmi} ({bmi_cat})\n"
+    response += f"• দৈনিক ক্যালোরি প্রয়োজন: {tdee} kcal\n"
+    response += f"• **ওজন কমাতে লক্ষ্য:** {target_calories} kcal/দিন\n\n"
     
-    if any(word in message_lower for word in ['medicine', 'ঔষধ', 'drug', 'medication', 'pill']):
-        response = f"💊 **ঔষধ সম্পর্কিত তথ্য:**\n\n"
-        response += f"{HEALTH_KNOWLEDGE['medicine']['importance']}\n\n"
-        
-        response += "**পরামর্শ:**\n"
-        for tip in HEALTH_KNOWLEDGE['medicine']['tips']:
-            response += f"{tip}\n"
-        
-        response += f"\n💡 {HEALTH_KNOWLEDGE['medicine']['app_feature']}"
-        return response
+    response += f"{HEALTH_KNOWLEDGE['weight_loss']['general']}\n\n"
+    response += f"**নিরাপদ হার:** {HEALTH_KNOWLEDGE['weight_loss']['safe_rate']}\n\n"
     
-    # ==================== BLOOD PRESSURE QUERIES ====================
+    response += "**পরামর্শ:**\n"
+    for tip in HEALTH_KNOWLEDGE['weight_loss']['tips']:
+        response += f"{tip}\n"
     
-    if any(word in message_lower for word in ['blood pressure', 'রক্তচাপ', 'bp', 'hypertension']):
-        response = f"🩸 **রক্তচাপ সম্পর্কিত তথ্য:**\n\n"
-        response += f"**স্বাভাবিক:** {HEALTH_KNOWLEDGE['blood_pressure']['normal']}\n\n"
-        
-        response += "**ক্যাটাগরি:**\n"
-        for cat, desc in HEALTH_KNOWLEDGE['blood_pressure']['categories'].items():
-            response += f"• {desc}\n"
-        
-        response += "\n**নিয়ন্ত্রণের উপায়:**\n"
-        for manage in HEALTH_KNOWLEDGE['blood_pressure']['management']:
-            response += f"{manage}\n"
-        
-        return response
+    response += "\n**খাবার পরিকল্পনা:**\n"
+    for meal, food in HEALTH_KNOWLEDGE['weight_loss']['diet_plan'].items():
+        response += f"• {meal.title()}: {food}\n"
     
-    # ==================== BLOOD SUGAR/DIABETES QUERIES ====================
+    return response
+
+def nutrition_response(message_lower, metrics):
+    """Nutrition queries"""
+    weight, tdee, water = metrics.weight, metrics.tdee, metrics.water
     
-    if any(word in message_lower for word in ['sugar', 'diabetes', 'glucose', 'চিনি', 'ডায়াবেটিস']):
-        response = f"🩸 **রক্তে শর্করা/ডায়াবেটিস:**\n\n"
-        response += "**স্বাভাবিক মাত্রা:**\n"
-        for test, value in HEALTH_KNOWLEDGE['blood_sugar']['normal'].items():
-            response += f"• {test.replace('_', ' ').title()}: {value}\n"
-        
-        response += "\n**প্রতিরোধের উপায়:**\n"
-        for prevent in HEALTH_KNOWLEDGE['blood_sugar']['diabetes_prevention']:
-            response += f"{prevent}\n"
-        
-        response += f"\n**লক্ষণ:** {HEALTH_KNOWLEDGE['blood_sugar']['signs']}"
-        return response
+    protein_need = round(weight * 0.8, 1)
+    response = f"🥗 **আপনার পুষ্টি পরিকল্পনা:**\n\n"
+    response += f"**দৈনিক প্রয়োজন:**\n"
+    response += f"• ক্যালোরি: {tdee} kcal\n"
+    response += f"• প্রোটিন: {protein_need}g (ওজনের 0.8g/kg)\n"
+    response += f"• পানি: {water}L\n"
+    response += f"• ফাইবার: 25-30g\n\n"
     
-    # ==================== MENTAL HEALTH QUERIES ====================
+    response += f"{HEALTH_KNOWLEDGE['nutrition']['balanced_diet']}\n\n"
     
-    if any(word in message_lower for word in ['mental', 'stress', 'মানসিক', 'চাপ', 'anxiety', 'depression']):
-        response = f"🧠 **মানসিক স্বাস্থ্য:**\n\n"
-        response += f"{HEALTH_KNOWLEDGE['mental_health']['importance']}\n\n"
-        
-        response += "**চাপ কমানোর উপায়:**\n"
-        for tip in HEALTH_KNOWLEDGE['mental_health']['stress_management']:
-            response += f"{tip}\n"
-        
-        if 'anxiety' in message_lower or 'দুশ্চিন্তা' in message_lower:
-            response += "\n**দুশ্চিন্তা কমানো:**\n"
-            for tip in HEALTH_KNOWLEDGE['mental_health']['anxiety_tips']:
-                response += f"• {tip}\n"
-        
-        return response
+    response += "**ম্যাক্রোনিউট্রিয়েন্ট:**\n"
+    for macro, info in HEALTH_KNOWLEDGE['nutrition']['macros'].items():
+        response += f"• {macro.upper()}: {info}\n"
     
-    # ==================== HEALTH DIARY QUERIES ====================
+    response += "\n**খাবারের সময়:**\n"
+    for timing in HEALTH_KNOWLEDGE['nutrition']['meal_timing']:
+        response += f"• {timing}\n"
     
-    if any(word in message_lower for word in ['diary', 'ডায়েরি', 'log', 'record']):
-        response = f"📝 **স্বাস্থ্য ডায়েরি:**\n\n"
-        response += f"{HEALTH_KNOWLEDGE['health_diary']['purpose']}\n\n"
-        
-        response += "**কি লিখবেন:**\n"
-        for item in HEALTH_KNOWLEDGE['health_diary']['what_to_log']:
-            response += f"{item}\n"
-        
-        response += "\n**উপকারিতা:**\n"
-        for benefit in HEALTH_KNOWLEDGE['health_diary']['benefits']:
-            response += f"• {benefit}\n"
-        
-        response += f"\n💡 {HEALTH_KNOWLEDGE['health_diary']['app_feature']}"
-        return response
+    response += f"\n💡 {HEALTH_KNOWLEDGE['nutrition']['food_tracking']}"
+    return response
+
+def water_response(message_lower, metrics):
+    """Water intake queries"""
+    weight, water = metrics.weight, metrics.water
     
-    # ==================== FAMILY HEALTH QUERIES ====================
+    response = f"💧 **আপনার পানি পানের নির্দেশনা:**\n\n"
+    response += f"**আপনার জন্য:** {water}L প্রতিদিন\n"
+    response += f"(শরীরের ওজন {weight}kg × 0.033 = {water}L)\n\n"
     
-    if any(word in message_lower for word in ['family', 'পরিবার', 'child', 'শিশু']):
-        response = f"👨‍👩‍👧‍👦 **পরিবারের স্বাস্থ্য:**\n\n"
-        response += f"{HEALTH_KNOWLEDGE['family_health']['features']}\n\n"
-        
-        response += "**সুবিধা:**\n"
-        for benefit in HEALTH_KNOWLEDGE['family_health']['benefits']:
-            response += f"{benefit}\n"
-        
-        return response
+    response += f"{HEALTH_KNOWLEDGE['water']['daily_need']}\n\n"
+    
+    response += "**পানির উপকারিতা:**\n"
+    for benefit in HEALTH_KNOWLEDGE['water']['benefits']:
+        response += f"{benefit}\n"
+    
+    response += "\n**কখন পানি পান করবেন:**\n"
+    for when in HEALTH_KNOWLEDGE['water']['when_to_drink']:
+        response += f"• {when}\n"
+    
+    response += f"\n💡 {HEALTH_KNOWLEDGE['water']['app_feature']}"
+    return response
+
+def sleep_response(message_lower, metrics):
+    """Sleep queries"""
+    response = f"😴 **ঘুম সম্পর্কিত তথ্য:**\n\n"
+    response += f"**আপনার বয়সের জন্য প্রয়োজন:** 7-9 ঘণ্টা\n\n"
+    
+    response += "**সকলের জন্য:**\n"
+    for age_group, hours in HEALTH_KNOWLEDGE['sleep']['daily_need'].items():
+        response += f"• {age_group.title()}: {hours}\n"
+    
+    response += "\n**ঘুমের উপকারিতা:**\n"
+    for benefit in HEALTH_KNOWLEDGE['sleep']['benefits']:
+        response += f"{benefit}\n"
+    
+    response += "\n**মান উন্নত করার উপায়:**\n"
+    for tip in HEALTH_KNOWLEDGE['sleep']['quality_tips']:
+        response += f"{tip}\n"
+    
+    response += f"\n💡 {HEALTH_KNOWLEDGE['sleep']['tracker']}"
+    return response
+
+def fitness_response(message_lower, metrics):
+    """Fitness & exercise queries"""
+    tdee, steps = metrics.tdee, metrics.steps
+    
+    response = f"💪 **আপনার ফিটনেস পরিকল্পনা:**\n\n"
+    response += f"**দৈনিক পদক্ষেপ লক্ষ্য:** {steps} steps\n"
+    response += f"**ক্যালোরি বার্ন প্রয়োজন:** {tdee} kcal/দিন\n\n"
     
-    # ==================== DEFAULT PERSONALIZED RESPONSE ====================
+    response += "**ব্যায়ামের ধরণ:**\n"
+    for ex_type, desc in HEALTH_KNOWLEDGE['fitness']['types'].items():
+        response += f"• {ex_type.upper()}: {desc}\n"
+    
+    response += "\n**শুরুকারীদের জন্য:**\n"
+    for week, plan in HEALTH_KNOWLEDGE['fitness']['beginner_plan'].items():
+        response += f"• {week.replace('_', ' ').title()}: {plan}\n"
+    
+    response += "\n**পরামর্শ:**\n"
+    for tip in HEALTH_KNOWLEDGE['fitness']['tips']:
+        response += f"✓ {tip}\n"
+    
+    response += f"\n💡 {HEALTH_KNOWLEDGE['fitness']['app_features']}"
+    return response
+
+def pregnancy_response(message_lower, metrics):
+    """Pregnancy queries"""
+    response = f"🤰 **গর্ভাবস্থা সম্পর্কিত তথ্য:**\n\n"
+    response += f"{HEALTH_KNOWLEDGE['pregnancy']['overview']}\n\n"
+    
+    response += "**ট্রাইমেস্টার:**\n"
+    for trimester, info in HEALTH_KNOWLEDGE['pregnancy']['trimesters'].items():
+        response += f"• {info}\n"
+    
+    response += "\n**পুষ্টি:**\n"
+    for nutrition in HEALTH_KNOWLEDGE['pregnancy']['nutrition']:
+        response += f"{nutrition}\n"
+    
+    response += "\n**নিরাপদ ব্যায়াম:**\n"
+    for exercise in HEALTH_KNOWLEDGE['pregnancy']['exercise']:
+        response += f"• {exercise}\n"
+    
+    response += f"\n💡 {HEALTH_KNOWLEDGE['pregnancy']['app_features']}"
+    return response
+
+def womens_health_response(message_lower, metrics):
+    """Women's health queries"""
+    response = f"👩 **মহিলাদের স্বাস্থ্য:**\n\n"
+    
+    response += "**পিরিয়ড সাইকেল:**\n"
+    period = HEALTH_KNOWLEDGE['womens_health']['period']
+    response += f"• সাইকেল: {period['cycle']}\n"
+    response += f"• সময়কাল: {period['duration']}\n"
+    response += "\n**ব্যথা উপশম:**\n"
+    for relief in period['pain_relief']:
+        response += f"• {relief}\n"
+    
+    if 'pcos' in message_lower:
+        pcos = HEALTH_KNOWLEDGE['womens_health']['pcos']
+        response += f"\n**PCOS লক্ষণ:** {pcos['symptoms']}\n"
+        response += "**ব্যবস্থাপনা:**\n"
+        for manage in pcos['management']:
+            response += f"• {manage}\n"
+    
+    response += f"\n💡 {period['tracker']}"
+    return response
+
+def medicine_response(message_lower, metrics):
+    """Medicine queries"""
+    response = f"💊 **ঔষধ সম্পর্কিত তথ্য:**\n\n"
+    response += f"{HEALTH_KNOWLEDGE['medicine']['importance']}\n\n"
+    
+    response += "**পরামর্শ:**\n"
+    for tip in HEALTH_KNOWLEDGE['medicine']['tips']:
+        response += f"{tip}\n"
+    
+    response += f"\n💡 {HEALTH_KNOWLEDGE['medicine']['app_feature']}"
+    return response
+
+def blood_pressure_response(message_lower, metrics):
+    """Blood pressure queries"""
+    response = f"🩸 **রক্তচাপ সম্পর্কিত তথ্য:**\n\n"
+    response += f"**স্বাভাবিক:** {HEALTH_KNOWLEDGE['blood_pressure']['normal']}\n\n"
+    
+    response += "**ক্যাটাগরি:**\n"
+    for cat, desc in HEALTH_KNOWLEDGE['blood_pressure']['categories'].items():
+        response += f"• {desc}\n"
+    
+    response += "\n**নিয়ন্ত্রণের উপায়:**\n"
+    for manage in HEALTH_KNOWLEDGE['blood_pressure']['management']:
+        response += f"{manage}\n"
+    
+    return response
+
+def blood_sugar_response(message_lower, metrics):
+    """Blood sugar/diabetes queries"""
+    response = f"🩸 **রক্তে শর্করা/ডায়াবেটিস:**\n\n"
+    response += "**স্বাভাবিক মাত্রা:**\n"
+    for test, value in HEALTH_KNOWLEDGE['blood_sugar']['normal'].items():
+        response += f"• {test.replace('_', ' ').title()}: {value}\n"
+    
+    response += "\n**প্রতিরোধের উপায়:**\n"
+    for prevent in HEALTH_KNOWLEDGE['blood_sugar']['diabetes_prevention']:
+        response += f"{prevent}\n"
+    
+    response += f"\n**লক্ষণ:** {HEALTH_KNOWLEDGE['blood_sugar']['signs']}"
+    return response
+
+def mental_health_response(message_lower, metrics):
+    """Mental health queries"""
+    response = f"🧠 **মানসিক স্বাস্থ্য:**\n\n"
+    response += f"{HEALTH_KNOWLEDGE['mental_health']['importance']}\n\n"
+    
+    response += "**চাপ কমানোর উপায়:**\n"
+    for tip in HEALTH_KNOWLEDGE['mental_health']['stress_management']:
+        response += f"{tip}\n"
+    
+    if 'anxiety' in message_lower or 'দুশ্চিন্তা' in message_lower:
+        response += "\n**দুশ্চিন্তা কমানো:**\n"
+        for tip in HEALTH_KNOWLEDGE['mental_health']['anxiety_tips']:
+            response += f"• {tip}\n"
+    
+    return response
+
+def health_diary_response(message_lower, metrics):
+    """Health diary queries"""
+    response = f"📝 **স্বাস্থ্য ডায়েরি:**\n\n"
+    response += f"{HEALTH_KNOWLEDGE['health_diary']['purpose']}\n\n"
+    
+    response += "**কি লিখবেন:**\n"
+    for item in HEALTH_KNOWLEDGE['health_diary']['what_to_log']:
+        response += f"{item}\n"
+    
+    response += "\n**উপকারিতা:**\n"
+    for benefit in HEALTH_KNOWLEDGE['health_diary']['benefits']:
+        response += f"• {benefit}\n"
+    
+    response += f"\n💡 {HEALTH_KNOWLEDGE['health_diary']['app_feature']}"
+    return response
+
+def family_health_response(message_lower, metrics):
+    """Family health queries"""
+    response = f"👨‍👩‍👧‍👦 **পরিবারের স্বাস্থ্য:**\n\n"
+    response += f"{HEALTH_KNOWLEDGE['family_health']['features']}\n\n"
+    
+    response += "**সুবিধা:**\n"
+    for benefit in HEALTH_KNOWLEDGE['family_health']['benefits']:
+        response += f"{benefit}\n"
+    
+    return response
+
+def default_response(metrics):
+    """Default personalized response"""
+    age, bmi, bmi_cat, tdee, water, steps = metrics.age, metrics.bmi, metrics.bmi_cat, metrics.tdee, metrics.water, metrics.steps
     
     response = f"👋 হ্যালো! আমি HealthNest AI, আপনার ব্যক্তিগত স্বাস্থ্য সহায়ক।\n\n"
     response += f"**আপনার প্রোফাইল:**\n"
@@ -749,6 +780,62 @@ def get_comprehensive_response(message, profile=None):
     
     return response
 
+# ==================== RESPONSE DISPATCH ====================
+
+# (topic, keywords, handler) in priority order; a handler may return None
+# to let the next matched topic answer
+RESPONSE_HANDLERS = (
+    ('app_info', ('কি', 'what is healthnest', 'app', 'অ্যাপ', 'healthnest কী', 'কেন ব্যবহার'), app_info_response),
+    ('bmi', ('bmi', 'বিএমআই', 'body mass'), bmi_response),
+    ('weight_loss', ('weight loss', 'ওজন কমা', 'lose weight', 'slim', 'fat'), weight_loss_response),
+    ('nutrition', ('nutrition', 'পুষ্টি', 'diet', 'খাবার', 'food'), nutrition_response),
+    ('water', ('water', 'পানি', 'hydrat', 'drink'), water_response),
+    ('sleep', ('sleep', 'ঘুম', 'rest', 'তিদ্রা'), sleep_response),
+    ('fitness', ('exercise', 'ব্যায়াম', 'workout', 'fitness', 'gym'), fitness_response),
+    ('pregnancy', ('pregnan', 'গর্ভ', 'মা', 'baby', 'শিশু'), pregnancy_response),
+    ('womens_health', ('period', 'পিরিয়ড', 'menstrua', 'মাসিক', 'pcos', 'menopause'), womens_health_response),
+    ('medicine', ('medicine', 'ঔষধ', 'drug', 'medication', 'pill'), medicine_response),
+    ('blood_pressure', ('blood pressure', 'রক্তচাপ', 'bp', 'hypertension'), blood_pressure_response),
+    ('blood_sugar', ('sugar', 'diabetes', 'glucose', 'চিনি', 'ডায়াবেটিস'), blood_sugar_response),
+    ('mental_health', ('mental', 'stress', 'মানসিক', 'চাপ', 'anxiety', 'depression'), mental_health_response),
+    ('health_diary', ('diary', 'ডায়েরি', 'log', 'record'), health_diary_response),
+    ('family_health', ('family', 'পরিবার', 'child', 'শিশু'), family_health_response),
+)
+
+def match_topic(message_lower, start=0):
+    """Index of the first handler from `start` on whose keywords appear in the message"""
+    # Plain `in` scans run in C and stop at the first hit, which beats a
+    # keyword automaton walked character by character in Python
+    for index in range(start, len(RESPONSE_HANDLERS)):
+        for keyword in RESPONSE_HANDLERS[index][1]:
+            if keyword in message_lower:
+                return index
+    return None
+
+def comprehensive_reply(message, profile=None):
+    """(answering topic, response text) for a message and user profile"""
+    
+    message_lower = message.lower()
+    metrics = ProfileMetrics(profile)
+    
+    # Only the handler that answers computes the profile metrics it needs
+    with METRICS.stage('keyword_routing'):
+        index = match_topic(message_lower)
+    
+    with METRICS.stage('respond'):
+        while index is not None:
+            topic, _, handler = RESPONSE_HANDLERS[index]
+            response = handler(message_lower, metrics)
+            if response is not None:
+                return topic, response
+            index = match_topic(message_lower, index + 1)
+        
+        return 'default', default_response(metrics)
+
+def get_comprehensive_response(message, profile=None):
+    """Generate comprehensive AI response based on message and user profile"""
+    return comprehensive_reply(message, profile)[1]
+
 # ==================== API ROUTES ====================
 
 @app.route('/')
@@ -794,15 +881,20 @@ def chat():
         if not message:
             return jsonify({"error": "No message provided"}), 400
         
-        # Generate comprehensive response
-        response = get_comprehensive_response(message, profile)
+        with METRICS.stage('detect_language'):
+            lang = detect_language(message)
         
-        return jsonify({
-            "response": response,
-            "category": "health_advice",
-            "confidence": 0.95,
-            "timestamp": datetime.now().isoformat()
-        })
+        # Generate comprehensive response
+        topic, response = comprehensive_reply(message, profile)
+        METRICS.count_chat(topic, lang)
+        
+        with METRICS.stage('serialize'):
+            return jsonify({
+                "response": response,
+                "category": "health_advice",
+                "confidence": 0.95,
+                "timestamp": datetime.now().isoformat()
+            })
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
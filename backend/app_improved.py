@@ -8,10 +8,19 @@ from flask_cors import CORS
 import json
 import re
 from datetime import datetime
+from metrics import Instrumentation, message_language
+from profiling import RequestProfiler, SamplingProfiler
 
 app = Flask(__name__)
 CORS(app)
 
+METRICS = Instrumentation('app_improved')
+METRICS.install(app)
+PROFILER = RequestProfiler('app_improved')
+PROFILER.install(app)
+SAMPLER = SamplingProfiler('app_improved')
+SAMPLER.install(app)
+
 print("🔄 Loading HealthNest AI...")
 
 # Comprehensive Health Knowledge Base
@@ -331,15 +340,18 @@ def chat():
         profile = data.get('profile', None)
         
         # Get personalized response
-        result = get_personalized_response(message, profile)
+        with METRICS.stage('respond'):
+            result = get_personalized_response(message, profile)
+        METRICS.count_chat('health_advice', message_language(message))
         
-        return jsonify({
-            'message': message,
-            'response': result.get('answer', 'I can help with health questions!'),
-            'metrics': result.get('metrics', {}),
-            'category': 'health_advice',
-            'confidence': 0.95
-        })
+        with METRICS.stage('serialize'):
+            return jsonify({
+                'message': message,
+                'response': result.get('answer', 'I can help with health questions!'),
+                'metrics': result.get('metrics', {}),
+                'category': 'health_advice',
+                'confidence': 0.95
+            })
         
     except Exception as e:
         return jsonify({
@@ -0,0 +1,252 @@
+"""
+HealthNest AI - Microbenchmarks
+Times the hot functions of each backend on fixed English and Bengali
+inputs, saves the results as a JSON baseline and compares later runs
+against it
+
+Usage (from the backend folder):
+    python benchmarks.py run --output benchmark_baseline.json
+    python benchmarks.py compare benchmark_baseline.json               # exit 1 on regression
+    python benchmarks.py compare benchmark_baseline.json current.json --tolerance 0.1
+"""
+
+import argparse
+import gc
+import importlib
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+# Fixed inputs so runs are comparable; change them only together with the baseline
+ENGLISH_CORPUS = (
+    'What is a healthy BMI?',
+    'How much water should I drink every day?',
+    'I am 20 weeks pregnant, what should I eat?',
+    'What causes headaches and how can I prevent them?',
+    'How many calories should I eat to lose weight?',
+    'Is running or cycling better for weight loss?',
+    'How can I lower my blood pressure naturally?',
+    'What are the early symptoms of diabetes?',
+    'My periods are irregular, could it be PCOS?',
+    'How many steps should I walk per day?',
+    'I feel stressed and cannot sleep at night',
+    'Which foods are high in protein?',
+)
+
+BENGALI_CORPUS = (
+    'আমার BMI কত হওয়া উচিত?',
+    'প্রতিদিন কত লিটার পানি পান করা উচিত?',
+    'গর্ভাবস্থায় কি খাবার খাওয়া উচিত?',
+    'ওজন কমানোর জন্য ডায়েট পরামর্শ দিন',
+    'রক্তচাপ কমানোর উপায় কি?',
+    'ডায়াবেটিস হলে কি খাওয়া যাবে?',
+    'রাতে ঘুম আসে না, কি করব?',
+    'ব্যায়াম শুরু করতে চাই, কোথা থেকে শুরু করব?',
+    'পিরিয়ডের সময় ব্যথা হলে কি করব?',
+    'মানসিক চাপ কমানোর উপায় বলুন',
+    'ঔষধ খাওয়ার রিমাইন্ডার কিভাবে সেট করব?',
+    'পরিবারের বয়স্কদের স্বাস্থ্য নিয়ে পরামর্শ',
+)
+
+PROFILE = {'age': 30, 'gender': 'female', 'weight': 68, 'height': 165, 'activity': 'moderate'}
+
+# Each sample runs the corpus enough times to last at least this long
+MIN_SAMPLE_SECONDS = 0.1
+DEFAULT_REPEATS = 15
+DEFAULT_TOLERANCE = 0.20
+
+
+def backend(name):
+    return importlib.import_module(name)
+
+
+def bench_answer_question(cached):
+    app = backend('app')
+    # Uncached: every pass starts with an empty result cache, so each call
+    # runs retrieval; cached: the cache stays warm after the first pass
+    reset = None if cached else app.QA_CACHE.clear
+    return lambda message: app.answer_question(message, PROFILE), ENGLISH_CORPUS, reset
+
+
+def bench_route_message(corpus):
+    app = backend('app')
+    return lambda message: app.route_message(message, PROFILE), corpus, None
+
+
+def bench_detect_language():
+    app_bilingual = backend('app_bilingual')
+    return app_bilingual.detect_language, ENGLISH_CORPUS + BENGALI_CORPUS, None
+
+
+def bench_find_best_match(corpus, language):
+    app_bilingual = backend('app_bilingual')
+    return (lambda message: app_bilingual.find_best_match(message, language),
+            corpus, app_bilingual.TOPIC_CACHE.clear)
+
+
+def bench_comprehensive_response(corpus):
+    app_comprehensive = backend('app_comprehensive')
+    return lambda message: app_comprehensive.get_comprehensive_response(message, PROFILE), corpus, None
+
+
+def bench_personalized_response():
+    app_improved = backend('app_improved')
+    return lambda message: app_improved.get_personalized_response(message, PROFILE), ENGLISH_CORPUS, None
+
+
+# name -> factory returning (function of one message, corpus, per-pass reset or None)
+BENCHMARKS = {
+    'app.answer_question': lambda: bench_answer_question(cached=False),
+    'app.answer_question[cached]': lambda: bench_answer_question(cached=True),
+    'app.route_message[en]': lambda: bench_route_message(ENGLISH_CORPUS),
+    'app.route_message[bn]': lambda: bench_route_message(BENGALI_CORPUS),
+    'app_bilingual.detect_language': bench_detect_language,
+    'app_bilingual.find_best_match[en]': lambda: bench_find_best_match(ENGLISH_CORPUS, 'en'),
+    'app_bilingual.find_best_match[bn]': lambda: bench_find_best_match(BENGALI_CORPUS, 'bn'),
+    'app_comprehensive.get_comprehensive_response[en]': lambda: bench_comprehensive_response(ENGLISH_CORPUS),
+    'app_comprehensive.get_comprehensive_response[bn]': lambda: bench_comprehensive_response(BENGALI_CORPUS),
+    'app_improved.get_personalized_response': bench_personalized_response,
+}
+
+
+def time_pass(function, corpus, reset):
+    """Seconds for one call per corpus item; the reset is not timed"""
+    if reset is not None:
+        reset()
+    started = time.perf_counter()
+    for message in corpus:
+        function(message)
+    return time.perf_counter() - started
+
+
+def measure(function, corpus, reset=None, repeats=DEFAULT_REPEATS):
+    """Per-call microseconds over `repeats` samples, like timeit with the GC paused"""
+    # Warm up (imports, lazily built indexes, branch caches), then size the samples
+    one_pass = max(time_pass(function, corpus, reset), 1e-9)
+    passes = max(1, int(MIN_SAMPLE_SECONDS / one_pass))
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            elapsed = sum(time_pass(function, corpus, reset) for _ in range(passes))
+            samples.append(elapsed / (passes * len(corpus)) * 1e6)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return {
+        'median_us': round(statistics.median(samples), 3),
+        'min_us': round(min(samples), 3),
+        'stdev_us': round(statistics.stdev(samples), 3) if len(samples) > 1 else 0.0,
+        'calls_per_sample': passes * len(corpus),
+        'samples': repeats
+    }
+
+
+def run(names=None, repeats=DEFAULT_REPEATS):
+    results = {}
+    for name, factory in BENCHMARKS.items():
+        if names and not any(pattern in name for pattern in names):
+            continue
+        function, corpus, reset = factory()
+        results[name] = measure(function, corpus, reset, repeats)
+        print(f"   {name}: {results[name]['median_us']} µs/call", file=sys.stderr)
+
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'benchmarks': results
+    }
+
+
+def compare(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    """Rows of (name, baseline µs, current µs, change, status) and whether anything regressed"""
+    rows = []
+    regressed = False
+    for name, result in current['benchmarks'].items():
+        before = baseline['benchmarks'].get(name)
+        if before is None:
+            rows.append((name, None, result['median_us'], None, 'new'))
+            continue
+
+        change = result['median_us'] / before['median_us'] - 1 if before['median_us'] else 0.0
+        if change > tolerance:
+            status = 'REGRESSED'
+            regressed = True
+        elif change < -tolerance:
+            status = 'faster'
+        else:
+            status = 'ok'
+        rows.append((name, before['median_us'], result['median_us'], change, status))
+    return rows, regressed
+
+
+def print_comparison(rows, tolerance):
+    width = max(len(row[0]) for row in rows) if rows else 10
+    print(f"{'benchmark':<{width}}  {'baseline µs':>12}  {'current µs':>12}  {'change':>8}  status")
+    for name, before, after, change, status in rows:
+        before_text = f'{before:.3f}' if before is not None else '-'
+        change_text = f'{change:+.1%}' if change is not None else '-'
+        print(f"{name:<{width}}  {before_text:>12}  {after:>12.3f}  {change_text:>8}  {status}")
+    print(f"(tolerance ±{tolerance:.0%} on the median)")
+
+
+def load_json(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HealthNest microbenchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the benchmarks and write the results')
+    run_parser.add_argument('--output', default='benchmark_baseline.json')
+    run_parser.add_argument('--filter', nargs='*', help='only benchmarks whose name contains one of these')
+    run_parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+
+    compare_parser = commands.add_parser('compare', help='fail if any benchmark is slower than the baseline')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current', nargs='?', help='saved results; runs the benchmarks now if omitted')
+    compare_parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                                help='allowed slowdown of the median, as a fraction')
+    compare_parser.add_argument('--filter', nargs='*')
+    compare_parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    args = parser.parse_args()
+
+    # Paths given on the command line are relative to where it was run
+    paths = {name: os.path.abspath(getattr(args, name)) if getattr(args, name, None) else None
+             for name in ('output', 'baseline', 'current')}
+    # Backends load models and data relative to this folder
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(backend_dir)
+    sys.path.insert(0, backend_dir)
+
+    if args.command == 'run':
+        results = run(args.filter, args.repeats)
+        with open(paths['output'], 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f"✅ {len(results['benchmarks'])} benchmarks written to {paths['output']}")
+        return 0
+
+    baseline = load_json(paths['baseline'])
+    current = load_json(paths['current']) if paths['current'] else run(args.filter, args.repeats)
+    rows, regressed = compare(baseline, current, args.tolerance)
+    print_comparison(rows, args.tolerance)
+    if regressed:
+        print("❌ Performance regression beyond tolerance")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
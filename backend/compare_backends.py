@@ -0,0 +1,167 @@
+"""
+HealthNest AI - Backend Comparison
+Runs the same mixed English/Bengali /chat workload against every backend
+variant, each in a fresh interpreter through its Flask test client, and
+prints startup time, latency, throughput, peak memory and response size
+side by side
+
+Usage (from the backend folder):
+    python compare_backends.py --requests 2000
+    python compare_backends.py --backends app app_bilingual --output comparison.json
+"""
+
+import argparse
+import importlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from loadgen import QA_CORPUS_PATH, Workload, load_bengali_prompts, load_english_prompts, summarize_latencies
+
+BACKENDS = ('app', 'app_improved', 'app_comprehensive', 'app_comprehensive_backup', 'app_bilingual')
+
+PROFILE = {'age': 30, 'gender': 'female', 'weight': 68, 'height': 165, 'activity': 'moderate'}
+
+WARMUP_REQUESTS = 50
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def measure_backend(name, messages):
+    """Runs inside the child interpreter; returns one result row"""
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    startup_seconds = time.perf_counter() - started
+    startup_rss = peak_rss_mb()
+
+    client = module.app.test_client()
+    for _, message in messages[:WARMUP_REQUESTS]:
+        client.post('/chat', json={'message': message, 'profile': PROFILE})
+
+    latencies = {'en': [], 'bn': []}
+    sizes = []
+    errors = 0
+    started = time.perf_counter()
+    for language, message in messages:
+        sent = time.perf_counter()
+        response = client.post('/chat', json={'message': message, 'profile': PROFILE})
+        latencies[language].append(time.perf_counter() - sent)
+        if response.status_code >= 400:
+            errors += 1
+        sizes.append(len(response.get_data()))
+    elapsed = time.perf_counter() - started
+
+    return {
+        'backend': name,
+        'startup_seconds': round(startup_seconds, 3),
+        'startup_rss_mb': startup_rss,
+        'peak_rss_mb': peak_rss_mb(),
+        'requests': len(messages),
+        'errors': errors,
+        'throughput_rps': round(len(messages) / elapsed, 1),
+        'latency_ms': summarize_latencies(latencies['en'] + latencies['bn']),
+        'latency_ms_en': summarize_latencies(latencies['en']),
+        'latency_ms_bn': summarize_latencies(latencies['bn']),
+        'response_bytes_mean': round(sum(sizes) / len(sizes), 1),
+        'response_bytes_max': max(sizes)
+    }
+
+
+def run_child(name, messages, timeout):
+    """Fresh interpreter per backend, so startup time and peak RSS are its own"""
+    process = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', name],
+        input=json.dumps(messages), capture_output=True, text=True, timeout=timeout
+    )
+    # The backends print their own startup banners; the result is the last line
+    lines = process.stdout.strip().splitlines()
+    if process.returncode != 0 or not lines:
+        error = (process.stderr.strip().splitlines() or ['no output'])[-1]
+        return {'backend': name, 'error': error}
+    return json.loads(lines[-1])
+
+
+def build_messages(count, bengali_ratio, seed, corpus=QA_CORPUS_PATH):
+    workload = Workload(load_english_prompts(corpus), load_bengali_prompts(), bengali_ratio, seed)
+    return [workload.next() for _ in range(count)]
+
+
+def print_table(rows):
+    columns = (
+        ('backend', lambda r: r['backend']),
+        ('startup s', lambda r: r['startup_seconds']),
+        ('req/s', lambda r: r['throughput_rps']),
+        ('p50 ms', lambda r: r['latency_ms']['p50']),
+        ('p95 ms', lambda r: r['latency_ms']['p95']),
+        ('p99 ms', lambda r: r['latency_ms']['p99']),
+        ('p50 bn ms', lambda r: r['latency_ms_bn'].get('p50', '-')),
+        ('startup MB', lambda r: r['startup_rss_mb']),
+        ('peak MB', lambda r: r['peak_rss_mb']),
+        ('avg bytes', lambda r: r['response_bytes_mean']),
+        ('errors', lambda r: r['errors']),
+    )
+    table = [[title for title, _ in columns]]
+    table.extend([str(value(row)) for _, value in columns] for row in rows if 'error' not in row)
+
+    widths = [max(len(line[i]) for line in table) for i in range(len(columns))]
+    for line in table:
+        print('  '.join(cell.ljust(widths[0]) if i == 0 else cell.rjust(widths[i])
+                        for i, cell in enumerate(line)))
+    for row in rows:
+        if 'error' in row:
+            print(f"⚠ {row['backend']} failed: {row['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the HealthNest backends on one /chat workload')
+    parser.add_argument('--backends', nargs='*', default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--bengali-ratio', type=float, default=0.3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=600.0, help='seconds allowed per backend')
+    parser.add_argument('--output', help='also write the results as JSON')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    # Backends load models and data relative to this folder
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(backend_dir)
+    sys.path.insert(0, backend_dir)
+
+    if args.child:
+        messages = [tuple(item) for item in json.load(sys.stdin)]
+        print(json.dumps(measure_backend(args.child, messages), ensure_ascii=False))
+        return
+
+    messages = build_messages(args.requests, args.bengali_ratio, args.seed)
+    rows = []
+    for name in args.backends:
+        print(f"🔄 {name}...", file=sys.stderr)
+        rows.append(run_child(name, messages, args.timeout))
+
+    print()
+    print_table(rows)
+
+    if output:
+        report = {
+            'requests': args.requests,
+            'bengali_ratio': args.bengali_ratio,
+            'seed': args.seed,
+            'python': sys.version.split()[0],
+            'results': rows
+        }
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f"\n✅ Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
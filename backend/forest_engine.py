@@ -0,0 +1,104 @@
+"""
+HealthNest AI - Flat Forest Inference
+RandomForestRegressor exported into flat NumPy node arrays and evaluated
+by a vectorized traversal, without sklearn's per-call overhead
+"""
+
+import numpy as np
+
+TREE_LEAF = -1
+FOREST_ARRAYS = ('feature', 'threshold', 'left', 'right', 'value', 'missing_left', 'roots')
+
+
+class FlatForest:
+    """All trees of a regression forest concatenated into one set of node arrays"""
+
+    def __init__(self, feature, threshold, left, right, value, missing_left, roots, n_features, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.missing_left = missing_left
+        self.roots = roots
+        self.n_features = int(n_features)
+        self.max_depth = int(max_depth)
+
+        # x32 <= t64 holds exactly when x32 <= (t64 rounded down to float32),
+        # so the hot loop can compare in float32 without changing any split
+        threshold32 = threshold.astype(np.float32)
+        too_high = threshold32.astype(np.float64) > threshold
+        self._threshold32 = np.where(too_high, np.nextafter(threshold32, np.float32(-np.inf)), threshold32)
+        # children[2 * node + went_left] is the next node: one gather per level
+        self._children = np.stack([right, left], axis=1).ravel().astype(np.intp)
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        """Flatten a fitted single-output RandomForestRegressor"""
+        features, thresholds, lefts, rights, values, missing, roots = [], [], [], [], [], [], []
+        offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left == TREE_LEAF
+
+            # Leaves point at themselves so every row can take max_depth steps
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+            values.append(tree.value[:, 0, 0])
+            missing.append(getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=np.uint8)))
+            roots.append(offset)
+            offset += tree.node_count
+
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            value=np.concatenate(values).astype(np.float64),
+            missing_left=np.concatenate(missing).astype(bool),
+            roots=np.array(roots, dtype=np.intp),
+            n_features=forest.n_features_in_,
+            max_depth=max(estimator.tree_.max_depth for estimator in forest.estimators_)
+        )
+
+    def save(self, path):
+        """Write the node arrays to an .npz file"""
+        np.savez(path, n_features=self.n_features, max_depth=self.max_depth,
+                 **{name: getattr(self, name) for name in FOREST_ARRAYS})
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        """Read node arrays written by save()"""
+        with np.load(path, mmap_mode=mmap_mode) as data:
+            arrays = {name: data[name] for name in FOREST_ARRAYS}
+            return cls(n_features=data['n_features'], max_depth=data['max_depth'], **arrays)
+
+    def apply(self, X):
+        """Leaf node index of every (row, tree) pair"""
+        # sklearn compares float32 inputs against float64 thresholds
+        X = np.ascontiguousarray(np.asarray(X, dtype=np.float32).reshape(-1, self.n_features))
+        has_missing = np.isnan(X).any()
+        flat_X = X.ravel()
+        row_offsets = (np.arange(X.shape[0]) * self.n_features)[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots)))
+
+        for _ in range(self.max_depth):
+            x = flat_X[row_offsets + self.feature[nodes]]
+            go_left = x <= self._threshold32[nodes]
+            if has_missing:
+                missing = np.isnan(x)
+                go_left[missing] = self.missing_left[nodes[missing]]
+            nodes = self._children[2 * nodes + go_left]
+        return nodes
+
+    def predict(self, X):
+        """Same result as RandomForestRegressor.predict, bit for bit"""
+        leaf_values = self.value[self.apply(X)]
+
+        # sklearn adds the trees one after another; cumsum keeps that order
+        # (np.sum would switch to pairwise summation and differ in the last bits)
+        total = np.cumsum(leaf_values, axis=1)[:, -1]
+        return total / leaf_values.shape[1]
@@ -0,0 +1,109 @@
+"""
+HealthNest AI - Keyword Matcher
+Aho-Corasick automaton that finds every keyword group in a message
+in a single pass, honouring word boundaries
+"""
+
+import unicodedata
+from collections import deque
+
+# Endings a keyword may carry and still count as a whole-word hit ("cramp" -> "cramps")
+INFLECTIONS = ('s', 'es', 'ing', 'ed')
+
+# Endings that only count after a keyword of MIN_DERIVATION_STEM letters or
+# more ("week" -> "weekly"); on short stems they make new words ("fat" -> "fatal")
+DERIVATIONS = ('al', 'ly')
+MIN_DERIVATION_STEM = 4
+
+
+def normalize_text(text):
+    """Unicode NFC and lowercase, applied to keywords and messages alike"""
+    return unicodedata.normalize('NFC', text).lower()
+
+
+def is_word_char(ch):
+    """Letters, digits and combining marks (Bengali vowel signs) are part of a word"""
+    return ch.isalnum() or ch == '_' or unicodedata.category(ch).startswith('M')
+
+
+class KeywordMatcher:
+    """Multi-pattern matcher over labelled keyword groups"""
+
+    def __init__(self, keyword_groups, exact_groups=(), whole_words=True):
+        # keyword_groups: {label: [keyword, ...]}; labels in exact_groups
+        # only match whole words, the rest also accept INFLECTIONS (and
+        # DERIVATIONS on longer keywords).
+        # whole_words=False reports plain substring hits (Bengali suffixes
+        # attach directly to the word, so boundaries would miss them)
+        self.whole_words = whole_words
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [[]]
+
+        for label, keywords in keyword_groups.items():
+            inflect = label not in exact_groups
+            for keyword in keywords:
+                self._add(normalize_text(keyword), label, inflect)
+        self._build()
+
+    def _add(self, keyword, label, inflect):
+        state = 0
+        for ch in keyword:
+            if ch not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+                self._goto[state][ch] = len(self._goto) - 1
+            state = self._goto[state][ch]
+        self._outputs[state].append((keyword, label, inflect))
+
+    def _build(self):
+        # Breadth-first failure links; each state inherits its fallback's outputs
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for ch, child in self._goto[state].items():
+                pending.append(child)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(ch, 0)
+                if self._fail[child] == child:
+                    self._fail[child] = 0
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def _ends_word(self, text, end, keyword, inflect):
+        if end == len(text) or not is_word_char(text[end]):
+            return True
+        if not inflect:
+            return False
+        tail_end = end
+        while tail_end < len(text) and is_word_char(text[tail_end]):
+            tail_end += 1
+        tail = text[end:tail_end]
+        if tail in INFLECTIONS:
+            return True
+        return tail in DERIVATIONS and len(keyword) >= MIN_DERIVATION_STEM
+
+    def find_all(self, text):
+        """Yield (label, keyword, start) for every whole-word keyword hit in text"""
+        text = normalize_text(text)
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+
+            for keyword, label, inflect in self._outputs[state]:
+                start = i - len(keyword) + 1
+                if not self.whole_words:
+                    yield label, keyword, start
+                    continue
+                if start > 0 and is_word_char(text[start - 1]):
+                    continue
+                if self._ends_word(text, i + 1, keyword, inflect):
+                    yield label, keyword, start
+
+    def match(self, text):
+        """Return the set of labels with at least one keyword in text"""
+        return {label for label, _, _ in self.find_all(text)}
@@ -0,0 +1,296 @@
+"""
+HealthNest AI - Load Generator
+Replays the expanded Q&A corpus (plus Bengali prompts built from the
+bilingual backend's keywords) against a running backend and reports
+throughput, latency percentiles and errors as JSON
+
+Usage (from the backend folder):
+    python loadgen.py --url http://localhost:5000 --concurrency 16 --duration 30
+    python loadgen.py --rate 200 --duration 60 --output report.json    # open loop
+"""
+
+import argparse
+import csv
+import http.client
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+QA_CORPUS_PATH = '../datasets/raw/expanded_medical_qa.csv'
+
+# Wrapped around each Bengali keyword to make a realistic chat message
+BENGALI_TEMPLATES = (
+    '{} সম্পর্কে বলুন',
+    '{} নিয়ে কিছু পরামর্শ দিন',
+    'আমার {} নিয়ে প্রশ্ন আছে',
+    '{} কেন গুরুত্বপূর্ণ?',
+)
+
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+def load_english_prompts(path=QA_CORPUS_PATH):
+    with open(path, encoding='utf-8') as f:
+        return [row['question'].strip() for row in csv.DictReader(f) if row.get('question', '').strip()]
+
+
+def load_bengali_prompts():
+    """One prompt per (keyword, template) from app_bilingual's knowledge base"""
+    from app_bilingual import HEALTH_KNOWLEDGE
+
+    keywords = []
+    for topic in HEALTH_KNOWLEDGE.values():
+        for keyword in topic.get('keywords_bn', []):
+            if keyword not in keywords:
+                keywords.append(keyword)
+    return [template.format(keyword) for keyword in keywords for template in BENGALI_TEMPLATES]
+
+
+class Workload:
+    """Endless, reproducible stream of (language, message) pairs"""
+
+    def __init__(self, english, bengali, bengali_ratio=0.3, seed=0):
+        self.english = english
+        self.bengali = bengali
+        self.bengali_ratio = bengali_ratio if bengali else 0.0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def next(self):
+        with self._lock:
+            if self._random.random() < self.bengali_ratio:
+                return 'bn', self._random.choice(self.bengali)
+            return 'en', self._random.choice(self.english)
+
+
+class Client:
+    """One keep-alive HTTP connection per thread"""
+
+    def __init__(self, url, path='/chat', timeout=30.0):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.https = parts.scheme == 'https'
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            conn = self._local.conn = cls(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def post(self, message):
+        """(status, response bytes); status is an exception name when the request failed"""
+        body = json.dumps({'message': message}).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        conn = self._connection()
+        try:
+            conn.request('POST', self.path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+            return response.status, len(data)
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            self._local.conn = None
+            return type(e).__name__, 0
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize_latencies(latencies):
+    values = sorted(latencies)
+    if not values:
+        return {}
+    summary = {'min': values[0], 'mean': sum(values) / len(values)}
+    for pct in PERCENTILES:
+        summary[f'p{pct:g}'] = percentile(values, pct)
+    summary['max'] = values[-1]
+    return {name: round(value * 1000, 3) for name, value in summary.items()}
+
+
+class Recorder:
+    """Collects samples; anything that starts before the warm-up ends is dropped"""
+
+    def __init__(self, measure_from):
+        self.measure_from = measure_from
+        self.samples = []
+        self._lock = threading.Lock()
+
+    def record(self, scheduled_at, finished_at, language, status, size):
+        if scheduled_at < self.measure_from:
+            return
+        with self._lock:
+            self.samples.append((finished_at - scheduled_at, language, status, size))
+
+
+def run_closed_loop(client, workload, recorder, concurrency, stop_at):
+    """Each worker sends its next request as soon as the previous one returns"""
+    def worker():
+        while time.perf_counter() < stop_at:
+            language, message = workload.next()
+            started = time.perf_counter()
+            status, size = client.post(message)
+            recorder.record(started, time.perf_counter(), language, status, size)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def run_open_loop(client, workload, recorder, rate, concurrency, stop_at, poisson=False, seed=0):
+    """Requests are issued on a fixed schedule regardless of how fast the server answers
+
+    Latency is measured from each request's scheduled send time, so time a
+    request spends waiting for a free connection (because the server fell
+    behind) counts against the server instead of silently disappearing
+    (coordinated omission).
+    """
+    arrivals = random.Random(seed)
+    late = 0
+
+    def send(scheduled_at, language, message):
+        status, size = client.post(message)
+        recorder.record(scheduled_at, time.perf_counter(), language, status, size)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        scheduled_at = time.perf_counter()
+        while scheduled_at < stop_at:
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -0.001:
+                late += 1
+            language, message = workload.next()
+            pool.submit(send, scheduled_at, language, message)
+            scheduled_at += arrivals.expovariate(rate) if poisson else 1.0 / rate
+    return late
+
+
+def build_report(samples, elapsed, config, late_dispatches=None):
+    ok = [s for s in samples if isinstance(s[2], int) and s[2] < 400]
+    errors = {}
+    for _, _, status, _ in samples:
+        if not (isinstance(status, int) and status < 400):
+            errors[str(status)] = errors.get(str(status), 0) + 1
+
+    by_language = {}
+    for language in sorted({s[1] for s in samples}):
+        latencies = [s[0] for s in ok if s[1] == language]
+        by_language[language] = {
+            'requests': sum(1 for s in samples if s[1] == language),
+            'latency_ms': summarize_latencies(latencies)
+        }
+
+    report = {
+        'config': config,
+        'duration_seconds': round(elapsed, 3),
+        'requests': len(samples),
+        'successful': len(ok),
+        'errors': errors,
+        'error_rate': round(1 - len(ok) / len(samples), 5) if samples else None,
+        'throughput_rps': round(len(ok) / elapsed, 2) if elapsed > 0 else None,
+        'latency_ms': summarize_latencies([s[0] for s in ok]),
+        'response_bytes_mean': round(sum(s[3] for s in ok) / len(ok), 1) if ok else None,
+        'by_language': by_language
+    }
+    if late_dispatches is not None:
+        report['late_dispatches'] = late_dispatches
+    return report
+
+
+def run(url, path='/chat', mode='closed', concurrency=8, rate=None, duration=30.0, warmup=5.0,
+        bengali_ratio=0.3, poisson=False, seed=0, timeout=30.0, corpus=QA_CORPUS_PATH):
+    workload = Workload(load_english_prompts(corpus), load_bengali_prompts(), bengali_ratio, seed)
+    client = Client(url, path, timeout)
+
+    started = time.perf_counter()
+    recorder = Recorder(measure_from=started + warmup)
+    stop_at = started + warmup + duration
+
+    late = None
+    if mode == 'open':
+        late = run_open_loop(client, workload, recorder, rate, concurrency, stop_at, poisson, seed)
+    else:
+        run_closed_loop(client, workload, recorder, concurrency, stop_at)
+
+    # Measured window: end of warm-up until the last in-flight request came back
+    elapsed = time.perf_counter() - recorder.measure_from
+    config = {
+        'url': url + path,
+        'mode': mode,
+        'concurrency': concurrency,
+        'rate': rate,
+        'arrivals': ('poisson' if poisson else 'uniform') if mode == 'open' else None,
+        'duration_seconds': duration,
+        'warmup_seconds': warmup,
+        'bengali_ratio': workload.bengali_ratio,
+        'english_prompts': len(workload.english),
+        'bengali_prompts': len(workload.bengali),
+        'seed': seed
+    }
+    return build_report(recorder.samples, elapsed, config, late)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay the HealthNest Q&A corpus against a backend')
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--path', default='/chat')
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='closed loop: concurrent clients; open loop: max requests in flight')
+    parser.add_argument('--rate', type=float, help='open loop: requests per second (fixed arrival rate)')
+    parser.add_argument('--poisson', action='store_true', help='open loop: exponential inter-arrival times')
+    parser.add_argument('--duration', type=float, default=30.0, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=5.0, help='seconds of load before measuring')
+    parser.add_argument('--bengali-ratio', type=float, default=0.3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--corpus', help=f'Q&A CSV to replay (default: {QA_CORPUS_PATH} from backend/)')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    args = parser.parse_args()
+
+    # User-supplied paths are relative to where the command was run
+    output = os.path.abspath(args.output) if args.output else None
+    corpus = os.path.abspath(args.corpus) if args.corpus else QA_CORPUS_PATH
+    # Default corpus and knowledge base paths are relative to this folder
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(backend_dir)
+    sys.path.insert(0, backend_dir)
+
+    mode = 'open' if args.rate else 'closed'
+    print(f"🔄 {mode}-loop load on {args.url}{args.path} for {args.warmup:g}s warm-up + {args.duration:g}s",
+          file=sys.stderr)
+    report = run(args.url, args.path, mode, args.concurrency, args.rate, args.duration, args.warmup,
+                 args.bengali_ratio, args.poisson, args.seed, args.timeout, corpus)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        print(f"✅ Report written to {output}", file=sys.stderr)
+    else:
+        print(text)
+
+    latency = report['latency_ms']
+    print(f"✓ {report['throughput_rps']} req/s | p50 {latency.get('p50')} ms | p99 {latency.get('p99')} ms | "
+          f"errors {report['error_rate']}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
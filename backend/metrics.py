@@ -0,0 +1,357 @@
+"""
+HealthNest AI - Instrumentation
+Per-route and per-stage latency histograms, counters and gauges shared by
+every backend, exposed in the Prometheus text format at /metrics
+"""
+
+import gzip
+import json
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import Response, current_app, g, has_request_context, request
+
+# Seconds; fine-grained at the low end where keyword routing and cache hits live
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Request headers that opt in to per-request timing: the first adds a
+# Server-Timing header, the second also adds a "timing" object to JSON bodies
+SERVER_TIMING_HEADER = 'X-Server-Timing'
+DEBUG_TIMING_HEADER = 'X-Debug-Timing'
+
+BENGALI_CHARS = re.compile(r'[\u0980-\u09FF]')
+
+# Stage timings recorded outside a request go here while capture_stages() is active
+STAGE_CAPTURE = threading.local()
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names, values, extra=()):
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{escape_label(value)}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self.samples())
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f'{self.name}{format_labels(self.labelnames, key)} {format_value(value)}' for key, value in values]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+
+    def observe(self, value, **labels):
+        self.observe_key(self._key(labels), value)
+
+    def observe_key(self, key, value):
+        """observe() for a label tuple built once by the caller (hot paths)"""
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket (non-cumulative) counts, the last slot is +Inf
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][slot] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            series = sorted((key, (list(counts), total, n)) for key, (counts, total, n) in self._series.items())
+
+        lines = []
+        for key, (counts, total, n) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = format_labels(self.labelnames, key, [('le', format_value(float(bound)))])
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {n}')
+        return lines
+
+
+class CallbackMetric(Metric):
+    """Gauge or counter whose samples are read from a function at scrape time"""
+
+    def __init__(self, name, documentation, labelnames=(), kind='gauge'):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self._sources = []
+
+    def add_source(self, collect):
+        # collect() -> iterable of (label values tuple, value)
+        with self._lock:
+            self._sources.append(collect)
+
+    def samples(self):
+        with self._lock:
+            sources = list(self._sources)
+        lines = []
+        for collect in sources:
+            for key, value in collect():
+                if value is not None:
+                    lines.append(f'{self.name}{format_labels(self.labelnames, key)} {format_value(value)}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    'healthnest_request_duration_seconds', 'HTTP request latency by route',
+    ('backend', 'route', 'method', 'status')))
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    'healthnest_stage_duration_seconds', 'Latency of one processing stage (routing, vectorize, similarity, ...)',
+    ('backend', 'stage')))
+CHAT_RESPONSES = REGISTRY.register(Counter(
+    'healthnest_chat_responses_total', 'Chat replies by answer category and language',
+    ('backend', 'category', 'language')))
+CACHE_HITS = REGISTRY.register(CallbackMetric(
+    'healthnest_cache_hits_total', 'Cache hits', ('backend', 'cache'), kind='counter'))
+CACHE_MISSES = REGISTRY.register(CallbackMetric(
+    'healthnest_cache_misses_total', 'Cache misses', ('backend', 'cache'), kind='counter'))
+CACHE_HIT_RATIO = REGISTRY.register(CallbackMetric(
+    'healthnest_cache_hit_ratio', 'Cache hits / lookups since start', ('backend', 'cache')))
+MODEL_LOAD_SECONDS = REGISTRY.register(CallbackMetric(
+    'healthnest_model_load_seconds', 'Duration of the last model load, by phase', ('backend', 'phase')))
+MODEL_VERSION = REGISTRY.register(CallbackMetric(
+    'healthnest_model_version', 'Live model set version', ('backend',)))
+
+
+@contextmanager
+def capture_stages():
+    """Collect stages timed on this thread outside a request (a batcher thread, say)"""
+    timings = []
+    previous = getattr(STAGE_CAPTURE, 'timings', None)
+    STAGE_CAPTURE.timings = timings
+    try:
+        yield timings
+    finally:
+        STAGE_CAPTURE.timings = previous
+
+
+def add_request_timings(timings):
+    """Add stages that ran elsewhere on the request's behalf to its Server-Timing breakdown"""
+    if has_request_context():
+        request_timings = g.get('stage_timings')
+        if request_timings is not None:
+            request_timings.extend(timings)
+
+
+def message_language(text):
+    """'bn' when over 20% of the message is Bengali script, else 'en' (for backends without a detector)"""
+    return 'bn' if len(BENGALI_CHARS.findall(text)) > len(text) * 0.2 else 'en'
+
+
+def timing_breakdown(timings):
+    """Stage -> milliseconds, stages that ran more than once summed, in first-run order"""
+    breakdown = {}
+    for name, seconds in timings:
+        breakdown[name] = breakdown.get(name, 0.0) + seconds * 1000
+    return {name: round(ms, 3) for name, ms in breakdown.items()}
+
+
+def add_timing(response, timings):
+    """Server-Timing header, plus the breakdown in the JSON body for debug requests"""
+    response.headers['Server-Timing'] = ', '.join(f'{name};dur={seconds * 1000:.3f}' for name, seconds in timings)
+    response.headers['Timing-Allow-Origin'] = '*'
+
+    if not request.headers.get(DEBUG_TIMING_HEADER) or response.mimetype != 'application/json':
+        return
+    if response.status_code == 304 or response.direct_passthrough:
+        return
+
+    body = response.get_data()
+    if response.headers.get('Content-Encoding') == 'gzip':
+        body = gzip.decompress(body)
+        del response.headers['Content-Encoding']
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return
+    if not isinstance(payload, dict):
+        return
+
+    payload['timing'] = timing_breakdown(timings)
+    response.set_data(current_app.json.dumps(payload) + '\n')
+    # The body no longer matches any cached representation
+    response.headers.pop('ETag', None)
+
+
+class StageTimer:
+    """Context manager behind Instrumentation.stage(); a plain class is cheaper than @contextmanager"""
+
+    __slots__ = ('name', 'key', 'started')
+
+    def __init__(self, name, key):
+        self.name = name
+        self.key = key
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.started
+        STAGE_LATENCY.observe_key(self.key, elapsed)
+        if has_request_context():
+            timings = g.get('stage_timings')
+        else:
+            timings = getattr(STAGE_CAPTURE, 'timings', None)
+        if timings is not None:
+            timings.append((self.name, elapsed))
+        return False
+
+
+class Instrumentation:
+    """Metrics handle for one backend; every series it records carries backend=<name>"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._stage_keys = {}
+
+    def install(self, app):
+        """Time every request and serve /metrics"""
+        backend = self.backend
+
+        @app.before_request
+        def start_request_timer():
+            g.metrics_started = time.perf_counter()
+            if request.headers.get(SERVER_TIMING_HEADER) or request.headers.get(DEBUG_TIMING_HEADER):
+                g.stage_timings = []
+
+        @app.after_request
+        def record_request(response):
+            started = g.pop('metrics_started', None)
+            if started is not None:
+                elapsed = time.perf_counter() - started
+                route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+                REQUEST_LATENCY.observe(elapsed, backend=backend, route=route,
+                                        method=request.method, status=response.status_code)
+                timings = g.pop('stage_timings', None)
+                if timings is not None:
+                    add_timing(response, timings + [('total', elapsed)])
+            return response
+
+        @app.route('/metrics', methods=['GET'])
+        def metrics():
+            return Response(REGISTRY.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+    def stage(self, name):
+        """Time a block as one processing stage (and into the request's breakdown if asked for)"""
+        key = self._stage_keys.get(name)
+        if key is None:
+            key = self._stage_keys[name] = STAGE_LATENCY._key({'backend': self.backend, 'stage': name})
+        return StageTimer(name, key)
+
+    def count_chat(self, category, language='en'):
+        CHAT_RESPONSES.inc(backend=self.backend, category=category, language=language)
+
+    def track_cache(self, name, stats):
+        """stats() returns a dict with 'hits' and 'misses' (QueryCache/ResponseCache style)"""
+        key = (self.backend, name)
+
+        def hits():
+            return [(key, stats()['hits'])]
+
+        def misses():
+            return [(key, stats()['misses'])]
+
+        def ratio():
+            current = stats()
+            lookups = current['hits'] + current['misses']
+            return [(key, current['hits'] / lookups if lookups else None)]
+
+        CACHE_HITS.add_source(hits)
+        CACHE_MISSES.add_source(misses)
+        CACHE_HIT_RATIO.add_source(ratio)
+
+    def track_model_store(self, store):
+        """Load/warmup duration of the last successful reload, and the live version"""
+        def durations():
+            for report in reversed(store.history):
+                if report.get('status') == 'ok':
+                    return [((self.backend, 'load'), report['load_seconds']),
+                            ((self.backend, 'warmup'), report['warmup_seconds'])]
+            return []
+
+        MODEL_LOAD_SECONDS.add_source(durations)
+        MODEL_VERSION.add_source(lambda: [((self.backend,), store.version)])
@@ -0,0 +1,230 @@
+"""
+HealthNest AI - Model Bundle
+Versioned on-disk model format: large arrays as raw .npy files that load
+memory-mapped (shared between server processes through the page cache),
+everything small as JSON, described by one manifest.json
+"""
+
+import json
+import os
+import shutil
+import time
+
+import joblib
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import LabelEncoder, normalize
+
+from forest_engine import FlatForest, FOREST_ARRAYS
+
+BUNDLE_FORMAT = 'healthnest-model-bundle'
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+
+# TfidfVectorizer settings that can be rebuilt from JSON
+VECTORIZER_PARAMS = ('analyzer', 'binary', 'decode_error', 'encoding', 'input', 'lowercase',
+                     'max_df', 'max_features', 'min_df', 'ngram_range', 'norm', 'smooth_idf',
+                     'stop_words', 'strip_accents', 'sublinear_tf', 'token_pattern', 'use_idf')
+
+
+def bundle_exists(directory):
+    return os.path.exists(os.path.join(directory, MANIFEST_NAME))
+
+
+class BundleWriter:
+    """Writes arrays and JSON into a staging folder, then moves it into place"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.staging = directory + '.tmp'
+        shutil.rmtree(self.staging, ignore_errors=True)
+        os.makedirs(self.staging)
+        self.manifest = {
+            'format': BUNDLE_FORMAT,
+            'format_version': BUNDLE_FORMAT_VERSION,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'arrays': {},
+            'components': {}
+        }
+
+    def array(self, name, value):
+        value = np.ascontiguousarray(value)
+        np.save(os.path.join(self.staging, f'{name}.npy'), value, allow_pickle=False)
+        self.manifest['arrays'][name] = {'dtype': value.dtype.str, 'shape': list(value.shape)}
+
+    def json(self, name, value):
+        with open(os.path.join(self.staging, f'{name}.json'), 'w', encoding='utf-8') as f:
+            json.dump(value, f, ensure_ascii=False)
+
+    def commit(self):
+        self.json('manifest', self.manifest)
+        # Fresh files (new inodes) replace the old folder, so servers that
+        # still have the previous bundle mapped keep reading valid pages
+        retired = self.directory + '.old'
+        shutil.rmtree(retired, ignore_errors=True)
+        if os.path.exists(self.directory):
+            os.rename(self.directory, retired)
+        os.rename(self.staging, self.directory)
+        shutil.rmtree(retired, ignore_errors=True)
+
+
+def vectorizer_to_json(vectorizer):
+    params = vectorizer.get_params()
+    if params['tokenizer'] is not None or params['preprocessor'] is not None or callable(params['analyzer']):
+        raise ValueError("vectorizers with custom callables can't be stored in a bundle")
+
+    config = {name: params[name] for name in VECTORIZER_PARAMS}
+    config['ngram_range'] = list(config['ngram_range'])
+    if config['stop_words'] is not None and not isinstance(config['stop_words'], str):
+        config['stop_words'] = sorted(config['stop_words'])
+    config['dtype'] = np.dtype(params['dtype']).name
+
+    # Terms ordered by column, which is all vocabulary_ encodes
+    terms = [None] * len(vectorizer.vocabulary_)
+    for term, column in vectorizer.vocabulary_.items():
+        terms[column] = term
+    return config, terms
+
+
+def vectorizer_from_json(config, terms, idf):
+    config = dict(config)
+    config['ngram_range'] = tuple(config['ngram_range'])
+    config['dtype'] = np.dtype(config['dtype']).type
+    vectorizer = TfidfVectorizer(**config)
+    vectorizer.vocabulary_ = {term: column for column, term in enumerate(terms)}
+    if config['use_idf']:
+        vectorizer.idf_ = idf
+    return vectorizer
+
+
+def save_bundle(directory, vectorizer=None, qa_database=None, question_matrix=None, calorie_forest=None,
+                exercise_recommender=None, exercise_encoder=None, health_knowledge=None):
+    """Write a bundle; components left as None are simply not included"""
+    writer = BundleWriter(directory)
+    components = writer.manifest['components']
+
+    if vectorizer is not None and qa_database is not None and question_matrix is not None:
+        config, terms = vectorizer_to_json(vectorizer)
+        writer.json('qa_vectorizer', {'config': config, 'terms': terms})
+        writer.json('qa_database', qa_database)
+        if config['use_idf']:
+            writer.array('qa_idf', vectorizer.idf_)
+
+        # Stored column-major: the layout InvertedIndex searches, so it maps without a copy
+        postings = sparse.csc_matrix(question_matrix)
+        postings.sort_indices()
+        for name in ('data', 'indices', 'indptr'):
+            writer.array(f'qa_postings_{name}', getattr(postings, name))
+        components['qa'] = {'num_questions': postings.shape[0], 'num_terms': postings.shape[1]}
+
+    if calorie_forest is not None:
+        for name in FOREST_ARRAYS:
+            writer.array(f'calorie_forest_{name}', getattr(calorie_forest, name))
+        components['calorie_forest'] = {
+            'n_features': calorie_forest.n_features,
+            'max_depth': calorie_forest.max_depth,
+            'num_trees': len(calorie_forest.roots)
+        }
+
+    if exercise_recommender is not None and exercise_encoder is not None:
+        # Not used on the request path, so a plain pickle is fine here
+        joblib.dump(exercise_recommender, os.path.join(writer.staging, 'exercise_recommender.joblib'))
+        writer.json('exercise_classes', exercise_encoder.classes_.tolist())
+        components['exercise'] = {'num_classes': len(exercise_encoder.classes_)}
+
+    if health_knowledge is not None:
+        writer.json('health_knowledge', health_knowledge)
+        components['health_knowledge'] = {'sections': sorted(health_knowledge)}
+
+    writer.commit()
+    return writer.manifest
+
+
+class ModelBundle:
+    """Read side of a bundle; arrays come back as read-only memory maps"""
+
+    def __init__(self, directory, mmap_mode='r'):
+        self.directory = directory
+        self.mmap_mode = mmap_mode
+        self.manifest = self._json('manifest')
+        if self.manifest.get('format') != BUNDLE_FORMAT:
+            raise ValueError(f"{directory} is not a model bundle")
+        if self.manifest.get('format_version', 0) > BUNDLE_FORMAT_VERSION:
+            raise ValueError(f"bundle format v{self.manifest['format_version']} is newer than this server (v{BUNDLE_FORMAT_VERSION})")
+        self.components = self.manifest['components']
+
+    def _json(self, name):
+        with open(os.path.join(self.directory, f'{name}.json'), encoding='utf-8') as f:
+            return json.load(f)
+
+    def array(self, name):
+        expected = self.manifest['arrays'][name]
+        value = np.load(os.path.join(self.directory, f'{name}.npy'), mmap_mode=self.mmap_mode, allow_pickle=False)
+        if value.dtype.str != expected['dtype'] or list(value.shape) != expected['shape']:
+            raise ValueError(f"bundle array {name} doesn't match its manifest entry")
+        return value
+
+    def qa_models(self):
+        """(vectorizer, qa_database, question matrix as sorted CSC) or Nones"""
+        if 'qa' not in self.components:
+            return None, None, None
+
+        stored = self._json('qa_vectorizer')
+        idf = self.array('qa_idf') if stored['config']['use_idf'] else None
+        vectorizer = vectorizer_from_json(stored['config'], stored['terms'], idf)
+
+        shape = (self.components['qa']['num_questions'], self.components['qa']['num_terms'])
+        matrix = sparse.csc_matrix((self.array('qa_postings_data'), self.array('qa_postings_indices'),
+                                    self.array('qa_postings_indptr')), shape=shape, copy=False)
+        matrix.has_sorted_indices = True
+        return vectorizer, self._json('qa_database'), matrix
+
+    def calorie_forest(self):
+        if 'calorie_forest' not in self.components:
+            return None
+        info = self.components['calorie_forest']
+        arrays = {name: self.array(f'calorie_forest_{name}') for name in FOREST_ARRAYS}
+        return FlatForest(n_features=info['n_features'], max_depth=info['max_depth'], **arrays)
+
+    def exercise_models(self):
+        if 'exercise' not in self.components:
+            return None, None
+        encoder = LabelEncoder()
+        encoder.classes_ = np.array(self._json('exercise_classes'))
+        return joblib.load(os.path.join(self.directory, 'exercise_recommender.joblib')), encoder
+
+    def health_knowledge(self):
+        if 'health_knowledge' not in self.components:
+            return {}
+        return self._json('health_knowledge')
+
+
+def export_pickles(models_dir='../models', directory=None):
+    """Convert the joblib/pickle files in models_dir into a bundle"""
+    directory = directory or os.path.join(models_dir, 'bundle')
+    vectorizer = joblib.load(os.path.join(models_dir, 'qa_vectorizer.pkl'))
+    qa_database = joblib.load(os.path.join(models_dir, 'qa_database.pkl'))
+    calorie_model = joblib.load(os.path.join(models_dir, 'calorie_predictor.pkl'))
+    with open(os.path.join(models_dir, 'health_knowledge.json')) as f:
+        health_knowledge = json.load(f)
+
+    calorie_forest = FlatForest.from_sklearn(calorie_model)
+    probe = np.random.default_rng(0).uniform(0, 100, (1024, calorie_model.n_features_in_))
+    assert np.array_equal(calorie_forest.predict(probe), calorie_model.predict(probe))
+
+    return save_bundle(
+        directory,
+        vectorizer=vectorizer,
+        qa_database=qa_database,
+        question_matrix=normalize(vectorizer.transform(qa_database['questions'])),
+        calorie_forest=calorie_forest,
+        exercise_recommender=joblib.load(os.path.join(models_dir, 'exercise_recommender.pkl')),
+        exercise_encoder=joblib.load(os.path.join(models_dir, 'exercise_encoder.pkl')),
+        health_knowledge=health_knowledge
+    )
+
+
+if __name__ == '__main__':
+    manifest = export_pickles()
+    print(f"✅ Model bundle written ({', '.join(manifest['components'])})")
@@ -0,0 +1,118 @@
+"""
+HealthNest AI - Model Store
+Keeps the live model set behind a single reference and replaces it with
+a freshly loaded, warmed-up set without pausing requests
+"""
+
+import gc
+import threading
+import time
+from collections import deque
+
+from process_utils import memory_usage
+
+# Reload reports kept for the admin endpoint
+RELOAD_HISTORY = 20
+
+
+def current_rss_mb():
+    usage = memory_usage()
+    return usage['rss_mb'] if usage else None
+
+
+class ModelStore:
+    """Double-buffered model set: the next set is built off to the side, then swapped in"""
+
+    def __init__(self, loader, warmup=None, check=None, retire=None):
+        # loader() -> model set; warmup(models) runs a few queries against it;
+        # check(old, new) returns a reason to reject new; retire(old) releases
+        # resources (process pools, shared memory) of a replaced or rejected set
+        self.loader = loader
+        self.warmup = warmup
+        self.check = check
+        self.retire = retire
+        self.current = None
+        self.version = 0
+        self.history = deque(maxlen=RELOAD_HISTORY)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def load(self):
+        """Initial, synchronous load"""
+        return self._load_and_swap('startup')
+
+    def reload(self, trigger='manual'):
+        """Load a new set in a background thread; False if a reload is already running"""
+        with self._lock:
+            if self.reloading:
+                return False
+            self._thread = threading.Thread(target=self._load_and_swap, args=(trigger,),
+                                            name='model-reload', daemon=True)
+            self._thread.start()
+        return True
+
+    @property
+    def reloading(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        """Block until a running reload finishes"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _load_and_swap(self, trigger):
+        report = {
+            'version': self.version + 1,
+            'trigger': trigger,
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'rss_before_mb': current_rss_mb()
+        }
+
+        new_models = None
+        try:
+            started = time.perf_counter()
+            new_models = self.loader()
+            report['load_seconds'] = round(time.perf_counter() - started, 3)
+
+            started = time.perf_counter()
+            if self.warmup is not None:
+                self.warmup(new_models)
+            report['warmup_seconds'] = round(time.perf_counter() - started, 3)
+
+            problem = None
+            if self.check is not None and self.current is not None:
+                problem = self.check(self.current, new_models)
+            if problem:
+                raise ValueError(problem)
+        except Exception as e:
+            # A rejected set still holds its own pools and shared memory
+            if new_models is not None and self.retire is not None:
+                self.retire(new_models)
+            report.update(status='failed', error=str(e))
+            self.history.append(report)
+            print(f"⚠ Model reload failed, keeping version {self.version}: {e}")
+            return report
+
+        report['rss_loaded_mb'] = current_rss_mb()
+
+        # One reference assignment: a request sees either the old set or the
+        # new one, never a mix, and in-flight requests keep the set they took
+        old_models = self.current
+        self.current = new_models
+        self.version += 1
+
+        if old_models is not None and self.retire is not None:
+            self.retire(old_models)
+        old_models = None
+        gc.collect()
+
+        report['rss_after_mb'] = current_rss_mb()
+        if report['rss_before_mb'] is not None and report['rss_after_mb'] is not None:
+            report['memory_delta_mb'] = round(report['rss_after_mb'] - report['rss_before_mb'], 1)
+        report['status'] = 'ok'
+        self.history.append(report)
+
+        print(f"✓ Models v{self.version} live ({trigger}): load {report['load_seconds']}s, "
+              f"warmup {report['warmup_seconds']}s, memory delta {report.get('memory_delta_mb')} MB")
+        return report
@@ -0,0 +1,167 @@
+"""
+HealthNest AI - Prefork Production Server
+Loads a backend's models once in a master process, freezes the GC and
+forks worker processes that share the loaded models copy-on-write
+
+Usage (from the backend folder):
+    python prefork.py app --workers 4 --port 5000
+    kill -USR1 <master pid>    # print per-worker memory
+    kill -HUP <master pid>     # ask every worker to reload its models
+"""
+
+import argparse
+import gc
+import importlib
+import os
+import signal
+import socket
+import sys
+import time
+
+from werkzeug.serving import make_server
+
+from process_utils import format_memory, memory_usage
+
+BACKENDS = ('app', 'app_bilingual', 'app_comprehensive', 'app_improved')
+
+
+class PreforkServer:
+    """Master process that owns the listening socket and a fixed set of workers"""
+
+    def __init__(self, backend='app', workers=None, host='0.0.0.0', port=5000):
+        self.backend = backend
+        self.num_workers = workers or os.cpu_count() or 1
+        self.host = host
+        self.port = port
+        self.workers = {}
+        self.worker_start_memory = {}
+        self.running = True
+        self.app = None
+        self.sock = None
+        self.worker_hup_handler = signal.SIG_DFL
+
+    def load(self):
+        """Import the backend once; its models and knowledge base load at import time"""
+        started = time.perf_counter()
+        self.app = importlib.import_module(self.backend).app
+        load_seconds = time.perf_counter() - started
+
+        # Everything loaded so far moves to the permanent generation, so the
+        # workers' collections never write to (and un-share) those pages
+        gc.collect()
+        gc.freeze()
+
+        print(f"✅ {self.backend} loaded in {load_seconds:.2f}s, {gc.get_freeze_count()} objects frozen")
+        print(format_memory('master', memory_usage()))
+
+    def bind(self):
+        self.sock = socket.create_server((self.host, self.port), backlog=1024)
+        self.sock.set_inheritable(True)
+
+    def spawn(self, slot):
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = slot
+            return pid
+
+        # Worker: default signal handling, serve on the inherited socket
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGUSR1, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, self.worker_hup_handler)
+        try:
+            server = make_server(self.host, self.port, self.app, threaded=True, fd=self.sock.fileno())
+            server.serve_forever()
+        finally:
+            os._exit(0)
+
+    def report(self, *_):
+        """Per-worker memory now next to what it was right after fork"""
+        print(f"\n📊 {self.backend} workers ({len(self.workers)}):")
+        print(format_memory('master', memory_usage()))
+        total_pss = 0.0
+        for pid, slot in sorted(self.workers.items(), key=lambda item: item[1]):
+            usage = memory_usage(pid)
+            before = self.worker_start_memory.get(pid)
+            print(format_memory(f'worker {slot} (pid {pid}) at start', before))
+            print(format_memory(f'worker {slot} (pid {pid}) now', usage))
+            if usage:
+                total_pss += usage['pss_mb']
+        print(f"   total worker PSS: {total_pss:.1f} MB")
+
+    def forward_reload(self, *_):
+        """SIGHUP reaches each worker, which reloads with the backend's own handler"""
+        # Reloaded models are private to each worker until the next restart
+        for pid in self.workers:
+            os.kill(pid, signal.SIGHUP)
+
+    def stop(self, *_):
+        self.running = False
+
+    def serve(self):
+        self.load()
+        self.bind()
+
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGUSR1, self.report)
+        # Backends that reload on SIGHUP keep that handler in the workers
+        self.worker_hup_handler = signal.getsignal(signal.SIGHUP) or signal.SIG_DFL
+        if self.worker_hup_handler is signal.SIG_DFL:
+            self.worker_hup_handler = signal.SIG_IGN
+        signal.signal(signal.SIGHUP, self.forward_reload)
+
+        for slot in range(self.num_workers):
+            self.spawn(slot)
+        time.sleep(0.5)
+        for pid, slot in self.workers.items():
+            self.worker_start_memory[pid] = memory_usage(pid)
+            print(format_memory(f'worker {slot} (pid {pid}) at start', self.worker_start_memory[pid]))
+
+        print(f"\n📡 Server: http://{self.host}:{self.port} ({self.num_workers} workers, master pid {os.getpid()})\n")
+
+        while self.running:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                time.sleep(0.5)
+                continue
+
+            # Replace a worker that died; it forks from the same loaded models
+            slot = self.workers.pop(pid, None)
+            self.worker_start_memory.pop(pid, None)
+            if slot is not None and self.running:
+                print(f"⚠️  Worker {slot} (pid {pid}) exited with status {status}, restarting")
+                new_pid = self.spawn(slot)
+                time.sleep(0.5)
+                self.worker_start_memory[new_pid] = memory_usage(new_pid)
+
+        self.report()
+        for pid in list(self.workers):
+            os.kill(pid, signal.SIGTERM)
+        for pid in list(self.workers):
+            os.waitpid(pid, 0)
+        self.sock.close()
+        print("👋 Prefork server stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a HealthNest backend with preforked workers')
+    parser.add_argument('backend', nargs='?', default='app', choices=BACKENDS)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args()
+
+    # Backends load models from ../models relative to this folder
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(backend_dir)
+    sys.path.insert(0, backend_dir)
+
+    PreforkServer(args.backend, args.workers, args.host, args.port).serve()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+HealthNest AI - Process Utilities
+Helpers for code that runs both in a single server process and in
+prefork workers forked from it
+"""
+
+import os
+import threading
+
+SMAPS_FIELDS = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty')
+
+
+class PerProcess:
+    """A resource (thread, process pool) created lazily once in each process
+
+    Threads and process pools don't survive fork, so anything created in
+    the master before the workers fork has to be started again, on first
+    use, in whichever process actually serves requests.
+    """
+
+    def __init__(self, start):
+        # start() -> the resource for the current process
+        self._start = start
+        self._pid = None
+        self.value = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._pid == os.getpid():
+            return self.value
+        with self._lock:
+            if self._pid != os.getpid():
+                self.value = self._start()
+                self._pid = os.getpid()
+        return self.value
+
+    @property
+    def active(self):
+        """Started in this process (and not reset since)"""
+        return self._pid == os.getpid()
+
+    def reset(self):
+        """Forget the resource (after the caller stopped it); the next get() starts a new one"""
+        with self._lock:
+            self._pid = None
+            self.value = None
+
+
+def memory_usage(pid='self'):
+    """RSS / PSS / shared / private memory of a process in MB (Linux only)"""
+    values = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                name, _, rest = line.partition(':')
+                if name in SMAPS_FIELDS:
+                    values[name] = int(rest.split()[0]) / 1024
+    except OSError:
+        return None
+
+    return {
+        'rss_mb': round(values.get('Rss', 0), 1),
+        'pss_mb': round(values.get('Pss', 0), 1),
+        'shared_mb': round(values.get('Shared_Clean', 0) + values.get('Shared_Dirty', 0), 1),
+        'private_mb': round(values.get('Private_Clean', 0) + values.get('Private_Dirty', 0), 1)
+    }
+
+
+def format_memory(label, usage):
+    if usage is None:
+        return f"   {label}: memory stats unavailable"
+    return (f"   {label}: RSS {usage['rss_mb']} MB | PSS {usage['pss_mb']} MB | "
+            f"shared {usage['shared_mb']} MB | private {usage['private_mb']} MB")
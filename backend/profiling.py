@@ -0,0 +1,378 @@
+"""
+HealthNest AI - Profilers
+On-demand cProfile of single requests (X-Profile: 1 plus the admin token)
+and an always-on sampling profiler, both served from admin endpoints as
+text reports, pstats data or collapsed stacks for flame graphs
+"""
+
+import cProfile
+import hmac
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import deque
+from itertools import count
+
+from flask import Response, g, jsonify, request
+
+from process_utils import PerProcess
+
+PROFILE_HEADER = 'X-Profile'
+ADMIN_TOKEN_HEADER = 'X-Admin-Token'
+
+# Profiles kept per process; older ones are dropped
+PROFILE_HISTORY = 32
+# Call paths nested deeper than this are folded into their parent
+COLLAPSED_MAX_DEPTH = 64
+
+# Sampling profiler: milliseconds between samples (0 turns it off; it also
+# stays off without an admin token) and a cap on distinct stacks kept,
+# beyond which new stacks are counted as truncated
+SAMPLER_INTERVAL_MS = float(os.environ.get('HEALTHNEST_SAMPLER_INTERVAL_MS', '10'))
+SAMPLER_MAX_STACKS = 20000
+SAMPLER_MAX_WINDOW_SECONDS = 120
+TRUNCATED_STACK = '[truncated]'
+
+# Leaf frames of threads that are blocked rather than running Python code
+# (idle server threads, queue consumers); left out of stacks unless ?idle=1
+IDLE_FRAMES = {
+    ('threading.py', 'wait'), ('threading.py', '_wait_for_tstate_lock'),
+    ('selectors.py', 'select'), ('socketserver.py', 'serve_forever'),
+    ('socket.py', 'readinto'), ('socket.py', 'accept'), ('ssl.py', 'read'),
+    ('queue.py', 'get'), ('connection.py', '_recv_bytes'),
+    # The admin request that is waiting out a ?seconds= window
+    ('profiling.py', 'window'),
+}
+
+
+def token_authorized(admin_token):
+    """Admin endpoints need the X-Admin-Token header to match the configured token"""
+    token = request.headers.get(ADMIN_TOKEN_HEADER, '')
+    return admin_token is not None and hmac.compare_digest(token, admin_token)
+
+
+def function_label(func):
+    filename, line, name = func
+    if filename == '~':
+        # Built-ins: cProfile reports them as ('~', 0, '<built-in method ...>')
+        return name
+    return f'{name} ({os.path.basename(filename)}:{line})'
+
+
+def collapsed_stacks(stats):
+    """Flame-graph input ("root;child;leaf microseconds") from cProfile data
+
+    cProfile records caller -> callee edges rather than whole stacks, so each
+    function's time is split across the paths that reach it in proportion to
+    the time spent through each calling edge.
+    """
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller in callers:
+            callees.setdefault(caller, []).append(func)
+
+    totals = {}
+
+    def walk(func, path, share):
+        # share: fraction of func's total time that arrived along this path
+        _, _, self_time, cumulative, _ = stats[func]
+        path = path + (func,)
+        micros = self_time * share * 1e6
+        if micros >= 1:
+            key = ';'.join(function_label(f) for f in path)
+            totals[key] = totals.get(key, 0) + micros
+        if len(path) >= COLLAPSED_MAX_DEPTH:
+            return
+        for callee in callees.get(func, ()):
+            if callee in path:
+                continue
+            callee_cumulative = stats[callee][3]
+            edge_cumulative = stats[callee][4][func][3]
+            if callee_cumulative > 0:
+                walk(callee, path, share * edge_cumulative / callee_cumulative)
+
+    for func, (_, _, _, _, callers) in stats.items():
+        if not callers:
+            walk(func, (), 1.0)
+
+    return ''.join(f'{key} {int(round(value))}\n' for key, value in sorted(totals.items()))
+
+
+class RequestProfiler:
+    """Opt-in cProfile for single requests plus /admin/profiles endpoints"""
+
+    def __init__(self, backend, admin_token=None, history=PROFILE_HISTORY):
+        self.backend = backend
+        self.admin_token = admin_token if admin_token is not None else os.environ.get('HEALTHNEST_ADMIN_TOKEN')
+        self.profiles = deque(maxlen=history)
+        self._ids = count(1)
+        # One profiled request at a time: newer Pythons allow only a single
+        # active profiler per process, and overlapping profiles are unreadable
+        self._active = threading.Lock()
+
+    def authorized(self):
+        return token_authorized(self.admin_token)
+
+    def install(self, app):
+        @app.before_request
+        def start_profile():
+            if not request.headers.get(PROFILE_HEADER) or not self.authorized():
+                return
+            if not self._active.acquire(blocking=False):
+                g.profile_busy = True
+                return
+            g.profile = cProfile.Profile()
+            g.profile_started = time.perf_counter()
+            g.profile.enable()
+
+        @app.after_request
+        def finish_profile(response):
+            entry = self._stop(response.status_code)
+            if entry is not None:
+                response.headers['X-Profile-Id'] = str(entry['id'])
+            elif g.pop('profile_busy', False):
+                response.headers[PROFILE_HEADER] = 'busy'
+            return response
+
+        @app.teardown_request
+        def abandon_profile(error=None):
+            # Unhandled exceptions skip after_request; keep the profile anyway
+            self._stop(500)
+
+        @app.route('/admin/profiles', methods=['GET'])
+        def admin_profiles():
+            """Recently profiled requests, newest first"""
+            if not self.authorized():
+                return jsonify({'error': 'Admin token required'}), 403
+
+            summaries = [{key: value for key, value in entry.items() if key != 'stats'}
+                         for entry in reversed(self.profiles)]
+            return jsonify({'backend': self.backend, 'profiles': summaries})
+
+        @app.route('/admin/profiles/<int:profile_id>', methods=['GET'])
+        def admin_profile(profile_id):
+            """One profile: ?format=text (default), collapsed or pstats"""
+            if not self.authorized():
+                return jsonify({'error': 'Admin token required'}), 403
+
+            entry = next((entry for entry in self.profiles if entry['id'] == profile_id), None)
+            if entry is None:
+                return jsonify({'error': 'Profile not found (it may have been evicted)'}), 404
+
+            output = request.args.get('format', 'text')
+            if output == 'pstats':
+                # Same bytes as Profile.dump_stats(); open with pstats.Stats(path) or snakeviz
+                return Response(marshal.dumps(entry['stats']), mimetype='application/octet-stream',
+                                headers={'Content-Disposition': f'attachment; filename=profile-{profile_id}.pstats'})
+            if output == 'collapsed':
+                return Response(collapsed_stacks(entry['stats']), mimetype='text/plain')
+            if output == 'text':
+                return Response(self.report(entry, request.args.get('sort', 'cumulative'),
+                                            request.args.get('limit', 40, type=int)), mimetype='text/plain')
+            return jsonify({'error': 'format must be text, collapsed or pstats'}), 400
+
+    def _stop(self, status):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return None
+        profile.disable()
+        duration = time.perf_counter() - g.pop('profile_started')
+        self._active.release()
+
+        profile.create_stats()
+        entry = {
+            'id': next(self._ids),
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'status': status,
+            'duration_ms': round(duration * 1000, 3),
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'stats': profile.stats
+        }
+        self.profiles.append(entry)
+        return entry
+
+    def report(self, entry, sort='cumulative', limit=40):
+        stream = io.StringIO()
+        stream.write(f"{entry['method']} {entry['path']} -> {entry['status']} "
+                     f"in {entry['duration_ms']} ms (profile {entry['id']}, {self.backend})\n\n")
+        stats = pstats.Stats(stream=stream)
+        stats.stats = entry['stats']
+        stats.get_top_level_stats()
+        stats.sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+
+def code_label(code):
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+class SamplingProfiler:
+    """Background thread that snapshots every thread's stack at a fixed interval"""
+
+    def __init__(self, backend, interval_ms=SAMPLER_INTERVAL_MS, admin_token=None,
+                 max_stacks=SAMPLER_MAX_STACKS):
+        self.backend = backend
+        self.admin_token = admin_token if admin_token is not None else os.environ.get('HEALTHNEST_ADMIN_TOKEN')
+        # Without an admin token nobody can read the samples, so don't take any
+        self.interval = interval_ms / 1000.0 if self.admin_token else 0.0
+        self.max_stacks = max_stacks
+        # (idle, code objects root first) -> samples
+        self.counts = {}
+        self.samples = 0
+        self.truncated = 0
+        self.sampling_seconds = 0.0
+        self.started_at = None
+        self._started = None
+        self._lock = threading.Lock()
+        self._thread = PerProcess(self._start_thread)
+        self._stopped = threading.Event()
+
+    @property
+    def enabled(self):
+        return self.interval > 0
+
+    def install(self, app):
+        @app.before_request
+        def start_sampler():
+            self.ensure_started()
+
+        @app.route('/admin/sampler', methods=['GET', 'POST'])
+        def admin_sampler():
+            """Sampler status; POST ?interval_ms=N changes the rate (0 stops sampling)"""
+            if not token_authorized(self.admin_token):
+                return jsonify({'error': 'Admin token required'}), 403
+
+            if request.method == 'POST':
+                interval_ms = request.args.get('interval_ms', type=float)
+                if interval_ms is None or interval_ms < 0:
+                    return jsonify({'error': 'interval_ms must be a number >= 0'}), 400
+                self.set_interval(interval_ms)
+                if request.args.get('reset') == '1':
+                    self.reset()
+            return jsonify(self.stats())
+
+        @app.route('/admin/sampler/stacks', methods=['GET'])
+        def admin_sampler_stacks():
+            """Collapsed stacks since start (or ?reset=1), or for the next ?seconds=N"""
+            if not token_authorized(self.admin_token):
+                return jsonify({'error': 'Admin token required'}), 403
+            if not self.enabled:
+                return jsonify({'error': 'Sampling profiler is off (interval_ms is 0)'}), 409
+
+            include_idle = request.args.get('idle') == '1'
+            seconds = request.args.get('seconds', type=float)
+            if seconds is not None:
+                if not 0 < seconds <= SAMPLER_MAX_WINDOW_SECONDS:
+                    return jsonify({'error': f'seconds must be between 0 and {SAMPLER_MAX_WINDOW_SECONDS}'}), 400
+                counts = self.window(seconds)
+            else:
+                counts = self.snapshot()
+                if request.args.get('reset') == '1':
+                    self.reset()
+            return Response(self.collapsed(counts, include_idle), mimetype='text/plain')
+
+    def ensure_started(self):
+        if self.enabled:
+            self._thread.get()
+
+    def _start_thread(self):
+        self.reset()
+        self._stopped = threading.Event()
+        sampler = threading.Thread(target=self._loop, args=(self._stopped,),
+                                   name='sampling-profiler', daemon=True)
+        sampler.start()
+        return sampler
+
+    def set_interval(self, interval_ms):
+        self.interval = interval_ms / 1000.0
+        if not self.enabled and self._thread.active:
+            self._stopped.set()
+            self._thread.reset()
+        self.ensure_started()
+
+    def _loop(self, stopped):
+        own_thread = threading.get_ident()
+        while not stopped.wait(self.interval):
+            started = time.perf_counter()
+            self.sample(own_thread)
+            self.sampling_seconds += time.perf_counter() - started
+
+    def sample(self, skip_thread=None):
+        """Add one snapshot of every other thread's stack"""
+        stacks = []
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == skip_thread:
+                continue
+            leaf = frame.f_code
+            idle = (os.path.basename(leaf.co_filename), leaf.co_name) in IDLE_FRAMES
+            codes = []
+            while frame is not None:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            codes.reverse()
+            stacks.append((idle, tuple(codes)))
+
+        with self._lock:
+            self.samples += 1
+            for key in stacks:
+                if key in self.counts or len(self.counts) < self.max_stacks:
+                    self.counts[key] = self.counts.get(key, 0) + 1
+                else:
+                    self.truncated += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counts)
+
+    def window(self, seconds):
+        """Samples taken during the next `seconds` only"""
+        self.ensure_started()
+        before = self.snapshot()
+        time.sleep(seconds)
+        after = self.snapshot()
+        return {key: hits - before.get(key, 0) for key, hits in after.items() if hits > before.get(key, 0)}
+
+    def reset(self):
+        with self._lock:
+            self.counts = {}
+            self.samples = self.truncated = 0
+            self.sampling_seconds = 0.0
+            self.started_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+            self._started = time.perf_counter()
+
+    def collapsed(self, counts, include_idle=False):
+        """"root;...;leaf count" lines, the input format of flamegraph.pl and speedscope"""
+        totals = {}
+        for (idle, codes), hits in counts.items():
+            if idle and not include_idle:
+                continue
+            key = ';'.join(code_label(code) for code in codes)
+            totals[key] = totals.get(key, 0) + hits
+        lines = [f'{key} {hits}\n' for key, hits in sorted(totals.items())]
+        if self.truncated:
+            lines.append(f'{TRUNCATED_STACK} {self.truncated}\n')
+        return ''.join(lines)
+
+    def stats(self):
+        with self._lock:
+            running = self.enabled and self._thread.active
+            elapsed = time.perf_counter() - self._started if self._started is not None else 0.0
+            idle = sum(hits for (is_idle, _), hits in self.counts.items() if is_idle)
+            return {
+                'backend': self.backend,
+                'running': running,
+                'interval_ms': round(self.interval * 1000, 3),
+                'since': self.started_at,
+                'samples': self.samples,
+                'thread_stacks': sum(self.counts.values()),
+                'idle_thread_stacks': idle,
+                'distinct_stacks': len(self.counts),
+                'truncated': self.truncated,
+                # Time the sampler held the interpreter, as a share of wall time
+                'overhead_percent': round(self.sampling_seconds / elapsed * 100, 3) if elapsed else 0.0
+            }
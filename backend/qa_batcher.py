@@ -0,0 +1,102 @@
+"""
+HealthNest AI - Q&A Micro-Batching
+Coalesces concurrent Q&A lookups so they are vectorized and scored together
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from process_utils import PerProcess
+
+
+class QueryBatcher:
+    """Collects queries from request threads and runs them through run_batch together"""
+
+    def __init__(self, run_batch, max_batch_size=32, window_ms=2.0):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.window = window_ms / 1000.0
+        self.batches = 0
+        self.queries = 0
+        self._queue = queue.Queue()
+        self._worker = PerProcess(self._start_worker)
+        self._last_batch_size = 0
+
+    def submit(self, payload):
+        """Queue a payload and return a Future for its result"""
+        self._worker.get()
+        future = Future()
+        self._queue.put((payload, future))
+        return future
+
+    def call(self, payload, timeout=None):
+        """Result for one payload; raises TimeoutError if it is still queued after timeout
+
+        A payload that times out while queued is withdrawn, so the caller can
+        compute it elsewhere without the batch repeating the work; one that a
+        batch has already started is waited for instead.
+        """
+        future = self.submit(payload)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            if future.cancel():
+                raise
+            return future.result()
+
+    def _start_worker(self):
+        self._queue = queue.Queue()
+        worker = threading.Thread(target=self._loop, name='qa-batcher', daemon=True)
+        worker.start()
+        return worker
+
+    def _collect(self):
+        batch = [self._queue.get()]
+
+        # Only linger for company when the last batch had some; a lone request
+        # at low load is flushed immediately so its latency doesn't regress
+        deadline = None
+        if self._last_batch_size > 1:
+            deadline = time.perf_counter() + self.window
+
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+
+            if deadline is None:
+                break
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _loop(self):
+        while True:
+            # Drop payloads whose callers gave up waiting; the rest can no longer be cancelled
+            batch = [(payload, future) for payload, future in self._collect()
+                     if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            self._last_batch_size = len(batch)
+            self.batches += 1
+            self.queries += len(batch)
+
+            try:
+                results = self.run_batch([payload for payload, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
@@ -0,0 +1,115 @@
+"""
+HealthNest AI - Q&A Inverted Index
+Top-k retrieval over the TF-IDF question matrix that only scores
+questions sharing at least one term with the query
+"""
+
+import hashlib
+import heapq
+import json
+import os
+
+import numpy as np
+from scipy import sparse
+
+
+def question_matrix_fingerprint(vectorizer, questions):
+    """Hash of everything the question matrix is derived from: vocabulary, idf and questions"""
+    digest = hashlib.sha256()
+    vocabulary = sorted((term, int(column)) for term, column in vectorizer.vocabulary_.items())
+    digest.update(json.dumps(vocabulary, ensure_ascii=False).encode('utf-8'))
+    if getattr(vectorizer, 'idf_', None) is not None:
+        digest.update(np.ascontiguousarray(vectorizer.idf_, dtype=np.float64).tobytes())
+    for question in questions:
+        digest.update(question.encode('utf-8') + b'\0')
+    return digest.hexdigest()
+
+
+def fingerprint_path(matrix_path):
+    return os.path.splitext(matrix_path)[0] + '.fingerprint'
+
+
+def save_question_matrix(path, matrix, fingerprint):
+    """Matrix plus a sidecar fingerprint of the vectorizer and questions it was built from"""
+    sparse.save_npz(path, matrix)
+    with open(fingerprint_path(path), 'w') as f:
+        f.write(fingerprint + '\n')
+
+
+def load_saved_question_matrix(path, fingerprint):
+    """The saved matrix if its fingerprint matches, else None (missing, stale or half-written)"""
+    try:
+        with open(fingerprint_path(path)) as f:
+            saved = f.read().strip()
+        if saved != fingerprint:
+            return None
+        return sparse.load_npz(path).tocsr()
+    except (OSError, ValueError):
+        return None
+
+
+class InvertedIndex:
+    """Posting lists keyed by TF-IDF term id"""
+
+    def __init__(self, question_matrix):
+        # Column-major layout: column t holds the (question, weight) postings of term t
+        postings = question_matrix.tocsc()
+        postings.sort_indices()
+        self.postings = postings
+        self.indptr = postings.indptr
+        self.doc_ids = postings.indices
+        self.weights = postings.data
+        self.num_questions = question_matrix.shape[0]
+        self.num_terms = question_matrix.shape[1]
+
+    def score(self, query_vec):
+        """Return (question ids, scores) for every question sharing a term with the query"""
+        query_vec = query_vec.tocsr()
+        doc_chunks = []
+        weight_chunks = []
+
+        for term, query_weight in zip(query_vec.indices, query_vec.data):
+            start, end = self.indptr[term], self.indptr[term + 1]
+            if start == end:
+                continue
+            doc_chunks.append(self.doc_ids[start:end])
+            weight_chunks.append(self.weights[start:end] * query_weight)
+
+        if not doc_chunks:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        docs = np.concatenate(doc_chunks)
+        contributions = np.concatenate(weight_chunks)
+
+        # Accumulate per question; work is proportional to the posting lists touched
+        candidates, slots = np.unique(docs, return_inverse=True)
+        scores = np.bincount(slots, weights=contributions)
+        return candidates, scores
+
+    def search(self, query_vec, k=1, threshold=0.0):
+        """Return up to k (question id, score) pairs with score above threshold, best first"""
+        candidates, scores = self.score(query_vec)
+        hits = ((score, int(doc)) for doc, score in zip(candidates, scores) if score > threshold)
+
+        # nlargest is stable, so ties resolve to the lowest question id like argmax
+        return [(doc, float(score)) for score, doc in heapq.nlargest(k, hits, key=lambda hit: hit[0])]
+
+    def search_batch(self, query_matrix, k=1, threshold=0.0):
+        """Top-k search for many queries with a single sparse matrix product"""
+        # (queries x terms) @ (terms x questions) walks the same posting lists in C
+        scores = (query_matrix.tocsr() @ self.postings.T).tocsr()
+        scores.sort_indices()
+
+        if np.isscalar(k):
+            k = [k] * scores.shape[0]
+        if np.isscalar(threshold):
+            threshold = [threshold] * scores.shape[0]
+
+        results = []
+        for row in range(scores.shape[0]):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            row_docs = scores.indices[start:end]
+            row_scores = scores.data[start:end]
+            hits = ((score, int(doc)) for doc, score in zip(row_docs, row_scores) if score > threshold[row])
+            results.append([(doc, float(score)) for score, doc in heapq.nlargest(k[row], hits, key=lambda hit: hit[0])])
+        return results
@@ -0,0 +1,159 @@
+"""
+HealthNest AI - Q&A Process Pool
+Runs TF-IDF tokenization and retrieval in worker processes that attach to
+one copy of the question index in shared memory
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+from process_utils import PerProcess
+from qa_index import InvertedIndex
+
+SPARSE_ARRAYS = ('data', 'indices', 'indptr')
+
+# How long close() lets searches already running finish before shutting down
+CLOSE_DRAIN_SECONDS = 10.0
+
+
+class SharedSparseMatrix:
+    """CSC matrix whose data/indices/indptr live in named shared memory blocks"""
+
+    def __init__(self, matrix):
+        matrix = sparse.csc_matrix(matrix)
+        matrix.sort_indices()
+        self.shape = matrix.shape
+        self.blocks = {}
+        self.layout = {}
+        for name in SPARSE_ARRAYS:
+            array = getattr(matrix, name)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+            self.blocks[name] = block
+            self.layout[name] = (block.name, array.dtype.str, array.shape)
+
+    def descriptor(self):
+        """Picklable description workers use to attach"""
+        return {'shape': self.shape, 'layout': self.layout}
+
+    def close(self):
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks = {}
+
+
+def attach_matrix(descriptor):
+    """Zero-copy CSC view over the shared blocks; returns (matrix, blocks)"""
+    blocks = []
+    arrays = {}
+    for name, (block_name, dtype, shape) in descriptor['layout'].items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        array.flags.writeable = False
+        arrays[name] = array
+    matrix = sparse.csc_matrix((arrays['data'], arrays['indices'], arrays['indptr']),
+                               shape=descriptor['shape'], copy=False)
+    matrix.has_sorted_indices = True
+    return matrix, blocks
+
+
+# Per-worker state, filled in by init_worker
+worker_vectorizer = None
+worker_index = None
+worker_blocks = None
+
+
+def init_worker(vectorizer, descriptor):
+    global worker_vectorizer, worker_index, worker_blocks
+    matrix, worker_blocks = attach_matrix(descriptor)
+    worker_vectorizer = vectorizer
+    worker_index = InvertedIndex(matrix)
+
+
+def search_chunk(questions, top_k, min_confidence):
+    """Worker task: same result as app.search_questions for these questions"""
+    question_vecs = normalize(worker_vectorizer.transform(questions))
+    return worker_index.search_batch(question_vecs, k=top_k, threshold=min_confidence)
+
+
+class RetrievalPool:
+    """Fans Q&A searches out to worker processes sharing one question index"""
+
+    def __init__(self, vectorizer, question_matrix, processes=None, chunk_size=64):
+        self.vectorizer = vectorizer
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.shared = SharedSparseMatrix(question_matrix)
+        self.owner_pid = os.getpid()
+        self.closed = False
+        self._in_flight = 0
+        self._idle = threading.Condition()
+        self._executor = PerProcess(self._start_executor)
+        atexit.register(self.close)
+
+    def _start_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=init_worker,
+            initargs=(self.vectorizer, self.shared.descriptor())
+        )
+
+    def start(self):
+        """Start the workers now rather than on the first query"""
+        self.search(['warm up'])
+
+    def search(self, questions, top_k=1, min_confidence=0.0):
+        """Top-k matches per question; big lists are split across the workers"""
+        with self._idle:
+            # Restarting workers after close() would attach to unlinked shared memory
+            if self.closed:
+                raise RuntimeError('retrieval pool is closed')
+            self._in_flight += 1
+        try:
+            return self._search(questions, top_k, min_confidence)
+        finally:
+            with self._idle:
+                self._in_flight -= 1
+                self._idle.notify_all()
+
+    def _search(self, questions, top_k, min_confidence):
+        executor = self._executor.get()
+        if np.isscalar(top_k):
+            top_k = [top_k] * len(questions)
+        if np.isscalar(min_confidence):
+            min_confidence = [min_confidence] * len(questions)
+
+        size = max(1, min(self.chunk_size, -(-len(questions) // self.processes)))
+        futures = [
+            executor.submit(search_chunk, questions[i:i + size], top_k[i:i + size], min_confidence[i:i + size])
+            for i in range(0, len(questions), size)
+        ]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def close(self, drain_seconds=CLOSE_DRAIN_SECONDS):
+        """Refuse new searches, let running ones finish, then stop the workers and free the index"""
+        with self._idle:
+            if self.closed:
+                return
+            self.closed = True
+            self._idle.wait_for(lambda: self._in_flight == 0, timeout=drain_seconds)
+        if self._executor.active:
+            self._executor.value.shutdown(wait=False, cancel_futures=True)
+            self._executor.reset()
+        # Only the process that created the blocks removes them
+        if os.getpid() == self.owner_pid:
+            self.shared.close()
@@ -0,0 +1,89 @@
+"""
+HealthNest AI - Query Result Cache
+LRU + TTL cache for retrieval results, keyed by a normalized form of the
+message so trivially different phrasings share one entry
+"""
+
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from keyword_matcher import normalize_text
+
+
+def normalize_query(text):
+    """NFC, lowercase, punctuation/symbols/whitespace collapsed to single spaces"""
+    words = []
+    current = []
+    for ch in normalize_text(text):
+        if ch.isspace() or unicodedata.category(ch)[0] in 'PS':
+            if current:
+                words.append(''.join(current))
+                current = []
+        else:
+            current.append(ch)
+    if current:
+        words.append(''.join(current))
+    return ' '.join(words)
+
+
+class QueryCache:
+    """Thread-safe LRU of retrieval results that also expire after ttl seconds"""
+
+    def __init__(self, max_entries=2048, ttl=600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expired += 1
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key, or compute(), store and return it"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
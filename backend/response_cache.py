@@ -0,0 +1,103 @@
+"""
+HealthNest AI - Static Response Cache
+Keeps static chat answers as ready-to-send JSON bytes (plain and gzip)
+so serving them is a dictionary lookup plus a write
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from functools import cached_property
+
+from flask import Response, request
+
+
+def to_json_bytes(value):
+    """Compact, key-sorted UTF-8 JSON (Bengali text stays 3 bytes per char)"""
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+class CachedResponse:
+    """One static payload, serialized once"""
+
+    def __init__(self, payload):
+        self.body = to_json_bytes(payload)
+        # Weak: per-request fields spliced in (timestamp, echoed message)
+        # don't change what the answer means
+        self.etag = hashlib.sha1(self.body).hexdigest()[:20]
+
+    @cached_property
+    def gzipped(self):
+        # Only bodies sent without dynamic fields can use it, so compress on first use
+        return gzip.compress(self.body, compresslevel=9)
+
+    def render(self, dynamic=None):
+        """Body bytes with any dynamic fields appended to the JSON object"""
+        if not dynamic:
+            return self.body
+        extra = b','.join(to_json_bytes(key) + b':' + to_json_bytes(value) for key, value in dynamic.items())
+        if self.body == b'{}':
+            return b'{' + extra + b'}'
+        return self.body[:-1] + b',' + extra + b'}'
+
+
+class ResponseCache:
+    """Bounded LRU of CachedResponse entries keyed by e.g. (topic, language)"""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """Return the entry for key, calling build() for the payload on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = CachedResponse(build())
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+    def respond(self, key, build, dynamic=None):
+        """Flask response for a cached payload, honouring gzip and (for GET/HEAD) If-None-Match"""
+        entry = self.get(key, build)
+        # A validator only means something for a representation a cache can
+        # store; a matching If-None-Match on POST would call for 412, not 304
+        conditional = request.method in ('GET', 'HEAD')
+
+        if conditional and request.if_none_match.contains_weak(entry.etag):
+            response = Response(status=304)
+            response.set_etag(entry.etag, weak=True)
+            return response
+
+        dynamic = {k: v for k, v in (dynamic or {}).items() if v is not None}
+        if not dynamic and request.accept_encodings['gzip'] > 0:
+            response = Response(entry.gzipped, mimetype='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = Response(entry.render(dynamic), mimetype='application/json')
+
+        response.vary.add('Accept-Encoding')
+        if conditional:
+            response.set_etag(entry.etag, weak=True)
+        return response
@@ -0,0 +1,47 @@
+"""
+HealthNest AI - Singleflight
+Identical queries that arrive while the first one is still being computed
+wait for its result instead of repeating the work
+"""
+
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Per-key deduplication of concurrent calls"""
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, compute, timeout=None):
+        """compute() once per key at a time; concurrent callers share its result (or error)"""
+        with self._lock:
+            self.calls += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = Future()
+                self._flights[key] = flight
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return flight.result(timeout=timeout)
+
+        try:
+            flight.set_result(compute())
+        except BaseException as e:
+            flight.set_exception(e)
+        finally:
+            # Later arrivals start a fresh computation (or hit the result cache)
+            with self._lock:
+                del self._flights[key]
+        return flight.result()
+
+    def stats(self):
+        with self._lock:
+            return {'calls': self.calls, 'coalesced': self.coalesced, 'in_flight': len(self._flights)}
@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+# The backend modules are flat files imported by name
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture
+def backend_cwd(monkeypatch):
+    """The apps load their models from ../models relative to backend/"""
+    monkeypatch.chdir(BACKEND_DIR)
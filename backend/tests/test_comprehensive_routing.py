@@ -0,0 +1,39 @@
+import pytest
+
+import app_comprehensive
+import app_comprehensive_backup
+from benchmarks import BENGALI_CORPUS, ENGLISH_CORPUS, PROFILE
+
+# One message per routing keyword, so every handler and its fallthrough is hit
+KEYWORD_MESSAGES = tuple(f'Tell me about {keyword} please'
+                         for _, keywords, _ in app_comprehensive.RESPONSE_HANDLERS
+                         for keyword in keywords)
+
+MESSAGES = ENGLISH_CORPUS + BENGALI_CORPUS + KEYWORD_MESSAGES + (
+    ' '.join(BENGALI_CORPUS * 20),
+    'What is the weather like today?',
+)
+
+PROFILES = [
+    PROFILE,
+    None,
+    {'age': 55, 'gender': 'male', 'weight': 92, 'height': 178, 'activity': 'sedentary'},
+]
+
+
+@pytest.mark.parametrize('profile', PROFILES)
+def test_dispatch_table_matches_the_original_if_chain(profile):
+    for message in MESSAGES:
+        expected = app_comprehensive_backup.get_comprehensive_response(message, profile)
+        assert app_comprehensive.get_comprehensive_response(message, profile) == expected, message
+
+
+def test_reply_topic_names_the_answering_handler():
+    handlers = {topic: handler for topic, _, handler in app_comprehensive.RESPONSE_HANDLERS}
+    for message in MESSAGES:
+        topic, text = app_comprehensive.comprehensive_reply(message, PROFILE)
+        metrics = app_comprehensive.ProfileMetrics(PROFILE)
+        if topic == 'default':
+            assert text == app_comprehensive.default_response(metrics), message
+        else:
+            assert handlers[topic](message.lower(), metrics) == text, message
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from forest_engine import FlatForest
+
+
+@pytest.fixture(scope='module')
+def forest():
+    rng = np.random.default_rng(0)
+    # Macros in grams -> calories, like the calorie predictor
+    X = rng.uniform(0, 80, size=(400, 3))
+    y = 4 * X[:, 0] + 4 * X[:, 1] + 9 * X[:, 2] + rng.normal(0, 15, size=400)
+    return RandomForestRegressor(n_estimators=25, max_depth=8, random_state=0).fit(X, y)
+
+
+def test_predict_matches_sklearn_bit_for_bit(forest):
+    X = np.random.default_rng(1).uniform(0, 100, size=(1000, 3))
+    flat = FlatForest.from_sklearn(forest)
+    np.testing.assert_array_equal(flat.predict(X), forest.predict(X))
+
+
+def test_single_row_and_thresholds(forest):
+    flat = FlatForest.from_sklearn(forest)
+    # Inputs sitting exactly on split thresholds exercise the float32 rounding
+    thresholds = flat.threshold[flat.left != np.arange(len(flat.left))]
+    X = np.column_stack([thresholds[:300]] * 3)
+    np.testing.assert_array_equal(flat.predict(X), forest.predict(X))
+    np.testing.assert_array_equal(flat.predict([[10.0, 20.0, 5.0]]), forest.predict([[10.0, 20.0, 5.0]]))
+
+
+def test_save_and_load_round_trip(forest, tmp_path):
+    X = np.random.default_rng(2).uniform(0, 100, size=(50, 3))
+    path = tmp_path / 'forest.npz'
+    FlatForest.from_sklearn(forest).save(path)
+    for mmap_mode in (None, 'r'):
+        loaded = FlatForest.load(path, mmap_mode=mmap_mode)
+        np.testing.assert_array_equal(loaded.predict(X), forest.predict(X))
@@ -0,0 +1,90 @@
+import pytest
+
+from keyword_matcher import KeywordMatcher, normalize_text
+
+GROUPS = {
+    'bmi': ['bmi', 'বিএমআই', 'body mass'],
+    'water': ['water', 'পানি', 'hydrat', 'drink'],
+    'pregnancy': ['pregnan', 'গর্ভ', 'মা', 'baby', 'শিশু'],
+    'family_health': ['family', 'পরিবার', 'child', 'শিশু'],
+    'mental_health': ['mental', 'stress', 'মানসিক', 'চাপ'],
+}
+
+MESSAGES = [
+    'What is a healthy BMI?',
+    'How much water should I drink every day?',
+    'I am pregnant and stressed about my baby',
+    'Childhood obesity runs in my family',
+    'আমার BMI কত হওয়া উচিত?',
+    'প্রতিদিন কত লিটার পানি পান করা উচিত?',
+    'গর্ভাবস্থায় মানসিক চাপ কমানোর উপায়',
+    'পরিবারের শিশুদের স্বাস্থ্য',
+    'nothing relevant here',
+    '',
+]
+
+
+def substring_labels(groups, text):
+    """The plain loop the matcher replaces: any keyword anywhere in the text"""
+    text = normalize_text(text)
+    return {label for label, keywords in groups.items()
+            if any(normalize_text(keyword) in text for keyword in keywords)}
+
+
+@pytest.mark.parametrize('message', MESSAGES)
+def test_substring_mode_matches_the_substring_loop(message):
+    matcher = KeywordMatcher(GROUPS, whole_words=False)
+    assert matcher.match(message) == substring_labels(GROUPS, message)
+
+
+def test_substring_mode_reports_every_occurrence():
+    matcher = KeywordMatcher({'water': ['water', 'ate']}, whole_words=False)
+    hits = sorted((keyword, start) for _, keyword, start in matcher.find_all('Water, more water'))
+    assert hits == [('ate', 1), ('ate', 13), ('water', 0), ('water', 12)]
+
+
+def test_whole_words_accept_inflections_only():
+    matcher = KeywordMatcher({'womens_health': ['cramp', 'period']})
+    assert matcher.match('bad cramps this month') == {'womens_health'}
+    assert matcher.match('my periods are late') == {'womens_health'}
+    assert matcher.match('the room felt cramped') == {'womens_health'}
+    assert matcher.match('scramp') == set()
+    assert matcher.match('periodic table') == set()
+
+
+def test_short_keywords_take_no_derivational_endings():
+    matcher = KeywordMatcher({'nutrition': ['fat'], 'pregnancy': ['week']})
+    assert matcher.match('fatal heart disease risk') == set()
+    assert matcher.match('saturated fats') == {'nutrition'}
+    assert matcher.match('weekly checkups') == {'pregnancy'}
+
+
+def test_fatal_is_not_routed_to_nutrition(backend_cwd):
+    import app
+    assert 'nutrition' not in app.CHAT_KEYWORDS.match('fatal heart disease risk')
+    reply = app.route_message('fatal heart disease risk')
+    assert reply is None or reply.get('category') != 'nutrition'
+
+
+def test_exact_groups_need_the_whole_word():
+    matcher = KeywordMatcher({'greeting': ['hi', 'hello']}, exact_groups={'greeting'})
+    assert matcher.match('Hi there') == {'greeting'}
+    assert matcher.match('hi!') == {'greeting'}
+    assert matcher.match('this is high') == set()
+    assert matcher.match('his') == set()
+
+
+def test_bengali_vowel_signs_are_part_of_the_word():
+    # "মা" inside "মানসিক" must not count as a whole word
+    matcher = KeywordMatcher({'pregnancy': ['মা']}, exact_groups={'pregnancy'})
+    assert matcher.match('মানসিক চাপ') == set()
+    assert matcher.match('মা ও শিশু') == {'pregnancy'}
+
+
+@pytest.mark.parametrize('message', MESSAGES)
+def test_bengali_topic_index_matches_the_substring_loop(message):
+    import app_bilingual
+    groups = {topic: data['keywords_bn'] for topic, data in app_bilingual.HEALTH_KNOWLEDGE.items()
+              if 'keywords_bn' in data}
+    matcher = app_bilingual.TOPIC_INDEX['bn']['matcher']
+    assert matcher.match(message) == substring_labels(groups, message)
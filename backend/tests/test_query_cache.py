@@ -0,0 +1,59 @@
+import query_cache
+from query_cache import QueryCache, normalize_query
+
+
+def test_normalize_query_collapses_case_punctuation_and_spaces():
+    assert normalize_query('  What is a healthy BMI??  ') == 'what is a healthy bmi'
+    assert normalize_query('What is a healthy\tBMI') == normalize_query('what is a healthy bmi!')
+    assert normalize_query('আমার BMI কত?') == 'আমার bmi কত'
+
+
+def test_evicts_least_recently_used():
+    cache = QueryCache(max_entries=2, ttl=60)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'b' is now the oldest
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.stats()['entries'] == 2
+
+
+def test_put_refreshes_recency():
+    cache = QueryCache(max_entries=2, ttl=60)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.put('a', 10)
+    cache.put('c', 3)
+    assert cache.get('a') == 10
+    assert cache.get('b') is None
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(query_cache.time, 'monotonic', lambda: now[0])
+    cache = QueryCache(max_entries=10, ttl=5)
+    cache.put('a', 1)
+
+    now[0] += 4.9
+    assert cache.get('a') == 1
+    now[0] += 0.2
+    assert cache.get('a', 'gone') == 'gone'
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['expired'], stats['entries']) == (1, 1, 1, 0)
+
+
+def test_get_or_compute_caches_falsy_values():
+    cache = QueryCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return []
+
+    assert cache.get_or_compute('k', compute) == []
+    assert cache.get_or_compute('k', compute) == []
+    assert len(calls) == 1
@@ -0,0 +1,39 @@
+import gzip
+import json
+
+import pytest
+
+import app_bilingual
+
+
+@pytest.fixture
+def client():
+    app_bilingual.RESPONSE_CACHE.clear()
+    return app_bilingual.app.test_client()
+
+
+def test_topic_get_carries_etag_and_revalidates(client):
+    first = client.get('/topics/bmi?lang=en')
+    assert first.status_code == 200
+    assert first.headers['ETag'].startswith('W/')
+    assert 'BMI' in first.get_json()['response']
+
+    again = client.get('/topics/bmi?lang=en', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+    assert again.data == b''
+
+
+def test_topic_get_is_gzipped_and_matches_chat(client):
+    zipped = client.get('/topics/bmi?lang=en', headers={'Accept-Encoding': 'gzip'})
+    assert zipped.headers['Content-Encoding'] == 'gzip'
+    body = json.loads(gzip.decompress(zipped.data))
+
+    chat = client.post('/chat?timestamp=0', json={'message': 'What is my BMI?'})
+    assert chat.get_json() == body
+    # POST answers are not validators, so they carry no ETag
+    assert 'ETag' not in chat.headers
+
+
+def test_topic_get_rejects_unknown_topic_and_language(client):
+    assert client.get('/topics/astrology?lang=en').status_code == 404
+    assert client.get('/topics/bmi?lang=fr').status_code == 400
@@ -0,0 +1,67 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_computation():
+    flights = SingleFlight()
+    release = threading.Event()
+    started = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'answer'
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        leader = pool.submit(flights.do, 'q', compute)
+        assert started.wait(5)
+        followers = [pool.submit(flights.do, 'q', compute) for _ in range(7)]
+        # Every follower has joined the flight before the leader finishes
+        while flights.stats()['calls'] < 8:
+            time.sleep(0.001)
+        release.set()
+        results = [leader.result(5)] + [f.result(5) for f in followers]
+
+    assert results == ['answer'] * 8
+    assert len(calls) == 1
+    assert flights.stats() == {'calls': 8, 'coalesced': 7, 'in_flight': 0}
+
+
+def test_different_keys_do_not_coalesce():
+    flights = SingleFlight()
+    assert flights.do('a', lambda: 1) == 1
+    assert flights.do('b', lambda: 2) == 2
+    assert flights.stats()['coalesced'] == 0
+
+
+def test_errors_reach_every_waiter_and_the_key_is_released():
+    flights = SingleFlight()
+    release = threading.Event()
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError('model unavailable')
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flights.do, 'q', fail)
+        assert started.wait(5)
+        follower = pool.submit(flights.do, 'q', fail)
+        while flights.stats()['calls'] < 2:
+            time.sleep(0.001)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(ValueError, match='model unavailable'):
+                future.result(5)
+
+    # A later call computes afresh instead of replaying the error
+    assert flights.do('q', lambda: 'recovered') == 'recovered'
+    assert flights.stats()['in_flight'] == 0
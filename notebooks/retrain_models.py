@@ -8,7 +8,13 @@ import pickle
 import json
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder
+from sklearn.preprocessing import LabelEncoder, normalize
+import sys
+
+sys.path.append('../backend')
+from forest_engine import FlatForest
+from model_bundle import save_bundle
+from qa_index import question_matrix_fingerprint, save_question_matrix
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import r2_score
 import warnings
@@ -50,6 +56,10 @@ with open('../models/qa_vectorizer.pkl', 'wb') as f:
 with open('../models/qa_database.pkl', 'wb') as f:
     pickle.dump(qa_database, f)
 
+# Precomputed question matrix so the backend doesn't re-vectorize the KB per request
+save_question_matrix('../models/qa_question_matrix.npz', normalize(question_vectors).tocsr(),
+                     question_matrix_fingerprint(vectorizer, questions.tolist()))
+
 print("✅ Q&A model saved!")
 
 # Load and train calorie predictor
@@ -70,6 +80,11 @@ if len(X_cal) > 2:
     
     with open('../models/calorie_predictor.pkl', 'wb') as f:
         pickle.dump(calorie_model, f)
+    
+    # Flat node arrays for the backend's lightweight inference path
+    calorie_forest = FlatForest.from_sklearn(calorie_model)
+    assert np.array_equal(calorie_forest.predict(X_test), calorie_model.predict(X_test))
+    calorie_forest.save('../models/calorie_forest.npz')
 
 # Load and train exercise recommender
 print("\n💪 Training Exercise Recommender...")
@@ -118,6 +133,22 @@ metadata = {
 with open('../models/model_metadata.json', 'w') as f:
     json.dump(metadata, f, indent=2)
 
+# Memory-mappable bundle the backend prefers over the pickles above
+print("\n📦 Writing model bundle...")
+with open('../models/health_knowledge.json') as f:
+    health_knowledge = json.load(f)
+
+save_bundle(
+    '../models/bundle',
+    vectorizer=vectorizer,
+    qa_database=qa_database,
+    question_matrix=normalize(question_vectors),
+    calorie_forest=calorie_forest if len(X_cal) > 2 else None,
+    exercise_recommender=exercise_model,
+    exercise_encoder=encoder,
+    health_knowledge=health_knowledge
+)
+
 print("\n" + "=" * 60)
 print("✅ ALL MODELS RETRAINED SUCCESSFULLY!")
 print("=" * 60)
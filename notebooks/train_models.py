@@ -15,8 +15,14 @@ from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.metrics import mean_squared_error, r2_score, accuracy_score
-from sklearn.preprocessing import LabelEncoder
+from sklearn.preprocessing import LabelEncoder, normalize
 import os
+import sys
+
+sys.path.append('../backend')
+from forest_engine import FlatForest
+from model_bundle import save_bundle
+from qa_index import question_matrix_fingerprint, save_question_matrix
 
 print("=" * 60)
 print("🧠 HealthNest AI - Model Training")
@@ -79,6 +85,9 @@ qa_db = {
     'categories': categories
 }
 joblib.dump(qa_db, '../models/qa_database.pkl')
+# Precomputed question matrix so the backend doesn't re-vectorize the KB per request
+save_question_matrix('../models/qa_question_matrix.npz', normalize(question_vectors).tocsr(),
+                     question_matrix_fingerprint(vectorizer, questions))
 print("✓ Q&A Model saved!")
 
 # 2. Train Calorie Predictor
@@ -101,6 +110,11 @@ print(f"✓ R² Score: {r2:.4f}")
 print(f"✓ RMSE: {rmse:.2f} calories")
 
 joblib.dump(calorie_model, '../models/calorie_predictor.pkl')
+
+# Flat node arrays for the backend's lightweight inference path
+calorie_forest = FlatForest.from_sklearn(calorie_model)
+assert np.array_equal(calorie_forest.predict(X_test.values), calorie_model.predict(X_test.values))
+calorie_forest.save('../models/calorie_forest.npz')
 print("✓ Calorie Predictor saved!")
 
 # 3. Train Exercise Recommender
@@ -189,6 +203,19 @@ with open('../models/health_knowledge.json', 'w') as f:
 
 print("✓ Health Knowledge Base created!")
 
+# Memory-mappable bundle the backend prefers over the pickles above
+save_bundle(
+    '../models/bundle',
+    vectorizer=vectorizer,
+    qa_database=qa_db,
+    question_matrix=normalize(question_vectors),
+    calorie_forest=calorie_forest,
+    exercise_recommender=exercise_model,
+    exercise_encoder=le_exercise,
+    health_knowledge=health_knowledge
+)
+print("✓ Model bundle saved!")
+
 # Save metadata
 metadata = {
     'project': 'HealthNest AI Health Assistant',
@@ -235,7 +262,9 @@ print("  4. Health Knowledge Base (Rule-based System)")
 print("\n💾 Saved Files:")
 print("  - ../models/qa_vectorizer.pkl")
 print("  - ../models/qa_database.pkl")
+print("  - ../models/qa_question_matrix.npz")
 print("  - ../models/calorie_predictor.pkl")
+print("  - ../models/calorie_forest.npz")
 print("  - ../models/exercise_recommender.pkl")
 print("  - ../models/exercise_encoder.pkl")
 print("  - ../models/health_knowledge.json")